@@ -1,31 +1,152 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from util.perf_util import timed
+
+COLUMNS = [
+    "Rank", "Title", "Artists", "Artists List", "Change", "Last Week", "Peak Position", "Total Weeks"
+]
+
+
+def get_change_labels(rank: np.ndarray, last_week: np.ndarray, total_weeks: np.ndarray) -> np.ndarray:
+    """
+    Change labels for int16 rank columns (0 for "no last week"): "NEW" for debuts, "RE"
+    for re-entries, "=" for no movement, else the number of spots moved up (positive)
+    or down (negative).
+    """
+    delta = last_week - rank
+    return np.where(
+        last_week == 0,
+        np.where(total_weeks > 1, "RE", "NEW"),
+        np.where(delta == 0, "=", delta.astype(str))
+    )
+
+
+# Every change label up to MAX_CHANGE spots, in the order pd.Categorical sorts them, and
+# the label position of each delta from -MAX_CHANGE to MAX_CHANGE
+MAX_CHANGE = 999
+CHANGE_LABELS = pd.Index(
+    sorted([str(d) for d in range(-MAX_CHANGE, MAX_CHANGE + 1) if d] + ["=", "NEW", "RE"]), dtype="str"
+)
+_DELTA_CODES = CHANGE_LABELS.get_indexer(
+    [str(d) if d else "=" for d in range(-MAX_CHANGE, MAX_CHANGE + 1)]
+).astype(np.int32)
+_NEW_CODE, _RE_CODE = CHANGE_LABELS.get_indexer(["NEW", "RE"])
+
+
+def get_change_categorical(rank: np.ndarray, last_week: np.ndarray, total_weeks: np.ndarray) -> pd.Categorical:
+    """get_change_labels as a categorical, built from integer codes without formatting a string per row."""
+    delta = last_week.astype(np.int32) - rank
+    if len(delta) and np.abs(delta).max() > MAX_CHANGE:
+        return pd.Categorical(get_change_labels(rank, last_week, total_weeks))
+
+    codes = np.where(
+        last_week == 0,
+        np.where(total_weeks > 1, _RE_CODE, _NEW_CODE),
+        _DELTA_CODES[delta + MAX_CHANGE]
+    )
+    return pd.Categorical.from_codes(codes, categories=CHANGE_LABELS).remove_unused_categories()
+
+
+def make_chart_frame(
+        rank: np.ndarray, titles, artists, artists_lists, last_week: np.ndarray,
+        peak_position: np.ndarray, total_weeks: np.ndarray
+    ) -> pd.DataFrame:
+    """
+    The chart DataFrame (COLUMNS) from int16 rank columns; the arrays are used without
+    copying. 'Artists List' is left out when artists_lists is None.
+    """
+    data = {
+        "Rank": rank,
+        "Title": titles,
+        "Artists": artists,
+        "Artists List": artists_lists,
+        "Change": get_change_categorical(rank, last_week, total_weeks),
+        "Last Week": pd.arrays.IntegerArray(last_week.copy(), last_week == 0),
+        "Peak Position": peak_position,
+        "Total Weeks": total_weeks,
+    }
+    if artists_lists is None:
+        del data["Artists List"]
+    return pd.DataFrame(data, columns=[c for c in COLUMNS if c in data], copy=False)
+
+
 class ChartData:
-    def __init__(
+    """
+    One chart week stored column by column. Parsers append rows straight into typed
+    buffers (int16 for ranks, peaks and weeks, 0 for "no last week"), and to_dataframe
+    builds the final frame from them without per-row objects or a coercion pass.
+    """
+
+    def __init__(self):
+        self.ranks = array("h")
+        self.titles: list[str] = []
+        self.artists: list[str] = []
+        self.artists_lists: list[list[str]] = []
+        self.last_weeks = array("h")
+        self.peak_positions = array("h")
+        self.total_weeks = array("h")
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ChartData) and self.to_dict() == other.to_dict()
+
+    def append(
             self, rank: int, title: str, artists: str, artistsList: list[str],
             last_week: int | None, peak_pos: int, total_weeks: int
         ):
-        self.rank = rank
-        self.title = title
-        self.artists = artists
-        self.artistsList = artistsList
-        self.peak_pos = peak_pos
-        self.total_weeks = total_weeks
-        self.last_week = last_week or None
-
-        self.change = ""
-        if self.last_week is None:
-            self.change = "RE" if self.total_weeks > 1 else "NEW"
-        else:
-            pos_change = self.last_week - self.rank
-            self.change = "=" if pos_change == 0 else str(pos_change)
-    
-    def get_dict(self) -> dict[str, any]:
+        self.ranks.append(rank)
+        self.titles.append(title)
+        self.artists.append(artists)
+        self.artists_lists.append(artistsList)
+        self.last_weeks.append(last_week or 0)
+        self.peak_positions.append(peak_pos)
+        self.total_weeks.append(total_weeks)
+
+    @timed("frame.build")
+    def to_dataframe(self) -> pd.DataFrame:
+        # Copies of the buffers: the frame must not change if more rows are appended
+        return make_chart_frame(
+            np.array(self.ranks, dtype=np.int16), self.titles, self.artists, self.artists_lists,
+            np.array(self.last_weeks, dtype=np.int16), np.array(self.peak_positions, dtype=np.int16),
+            np.array(self.total_weeks, dtype=np.int16)
+        )
+
+    def to_dict(self) -> dict[str, list]:
+        """Plain column lists, e.g. for JSON storage in the chart archive."""
         return {
-            "Rank": self.rank,
-            "Title": self.title,
+            "Rank": self.ranks.tolist(),
+            "Title": self.titles,
             "Artists": self.artists,
-            "Artists List": self.artistsList,
-            "Change": self.change,
-            "Last Week": self.last_week,
-            "Peak Position": self.peak_pos,
-            "Total Weeks": self.total_weeks
+            "Artists List": self.artists_lists,
+            "Last Week": self.last_weeks.tolist(),
+            "Peak Position": self.peak_positions.tolist(),
+            "Total Weeks": self.total_weeks.tolist(),
         }
+
+    @classmethod
+    def from_dict(cls, columns: dict[str, list]) -> "ChartData":
+        chart = cls()
+        chart.ranks.extend(columns["Rank"])
+        chart.titles = list(columns["Title"])
+        chart.artists = list(columns["Artists"])
+        chart.artists_lists = list(columns["Artists List"])
+        chart.last_weeks.extend(lw or 0 for lw in columns["Last Week"])
+        chart.peak_positions.extend(columns["Peak Position"])
+        chart.total_weeks.extend(columns["Total Weeks"])
+        return chart
+
+    @classmethod
+    def from_records(cls, records: list[dict[str, any]]) -> "ChartData":
+        """Builds a chart from the older list-of-row-dicts layout."""
+        chart = cls()
+        for r in records:
+            chart.append(
+                r["Rank"], r["Title"], r["Artists"], r["Artists List"],
+                r["Last Week"], r["Peak Position"], r["Total Weeks"]
+            )
+        return chart
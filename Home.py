@@ -1,30 +1,23 @@
 import streamlit as st
 import pandas as pd
 from datetime import date, datetime, timedelta
-from util.chart_util import get_chart_data
+from util.chart_registry import CHARTS, DEFAULT_CHART
+from util.chart_util import get_chart_data, fetch_charts_concurrently, prefetch_charts
+from util.date_util import get_adjacent_chart_dates, get_saturday_of_week, is_current_week
+from util.history_store import is_history_store_current, open_history_store
+from util.perf_util import count, report_page_metrics
+from util.viz_util import add_change_columns
 
 # ==============================================================================
 # 1. CONSTANTS
 # ==============================================================================
 
-MIN_DATE = date(1958, 8, 1)
 TODAY = date.today()
-NUMERIC_COLS = ["Rank", "Peak Position", "Total Weeks", "Last Week"]
 
 # ==============================================================================
 # 2. UTILITIES
 # ==============================================================================
 
-def get_saturday_of_week(date_input: date) -> str:
-    """
-    Given a date (datetime.date), return the Saturday of the same week (as 'YYYY-MM-DD').
-    The week is defined as Sunday (start) to Saturday (end).
-    """
-    weekday = (date_input.weekday() + 1) % 7  # Sunday=0, Monday=1, ..., Saturday=6
-    saturday = date_input + timedelta(days=(6 - weekday))
-    return saturday.strftime("%Y-%m-%d")
-
-
 def get_effective_chart_date(selected_date: date) -> str:
     """
     Determines the correct chart date:
@@ -38,60 +31,88 @@ def get_effective_chart_date(selected_date: date) -> str:
 
 
 @st.cache_data(ttl=600)
-def get_hot_100_chart_dataframe(date_str: str) -> pd.DataFrame:
+def get_chart_dataframe(date_str: str, chart_id: str = DEFAULT_CHART) -> pd.DataFrame:
     """
-    Returns a pandas DataFrame of the Billboard Hot 100 chart for a given date.
-    Performs robust type conversion on numeric columns.
+    Returns a pandas DataFrame of the chart_id chart for a given date.
+    Columns come out of the parser already typed, so no conversion pass is needed.
+    The decoded change columns are added here once and shared by every page.
     """
+    count("st_cache.chart.miss")  # Only runs when st.cache_data has no entry
     try:
-        data = get_chart_data(date_str)
-        df = pd.DataFrame(data)
-
-        for col in NUMERIC_COLS:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-
-        return df
+        return add_change_columns(get_chart_data(date_str, chart_id=chart_id).to_dataframe())
 
     except Exception as e:
         st.error(f"Could not retrieve chart for {date_str}. Please try a different date.\n\nError: {e}")
         return pd.DataFrame()
 
+@st.cache_data(ttl=60, show_spinner=False)
+def is_store_current() -> bool:
+    """
+    Whether the history store was built from the archive as it is now (not after a
+    re-fetch or --reparse), checked at most once a minute per process.
+    """
+    return is_history_store_current()
+
+def load_chart_frame(date_str: str, chart_id: str = DEFAULT_CHART) -> pd.DataFrame:
+    """
+    Past Hot 100 weeks in an up-to-date history store come straight from its shared
+    memory-mapped columns, so sessions don't each hold a copy; other weeks go through
+    the cache above.
+    """
+    if chart_id == DEFAULT_CHART and not is_current_week(date_str) and is_store_current():
+        store = open_history_store()
+        if store is not None and store.has_week(date_str):
+            count("history.chart.hit")
+            return add_change_columns(store.get_week(date_str))
+    count("st_cache.chart.calls")
+    return get_chart_dataframe(date_str, chart_id)
+
 # ==============================================================================
 # 3. STREAMLIT UI
 # ==============================================================================
 
-st.set_page_config(page_title="🎵 Billboard Hot 100 Viewer", layout="centered")
+st.set_page_config(page_title="🎵 Billboard Chart Viewer", layout="centered")
 
-st.title("🎵 Billboard Hot 100 Chart Viewer")
-st.markdown("### 🗓️ Select a date and click **Get Chart** to load the Billboard Hot 100 data across all pages.")
+st.title("🎵 Billboard Chart Viewer")
+st.markdown("### 🗓️ Select a chart and a date and click **Get Chart** to load its data across all pages.")
 
 st.session_state.setdefault("df", pd.DataFrame())
 st.session_state.setdefault("df_last_week", pd.DataFrame())
 st.session_state.setdefault("chart_date", TODAY.strftime("%Y-%m-%d"))
+st.session_state.setdefault("chart_id", DEFAULT_CHART)
+
+chart_id = st.selectbox("Select a chart", list(CHARTS), format_func=lambda slug: CHARTS[slug].name)
+chart_spec = CHARTS[chart_id]
 
 selected_date = st.date_input(
     "Select a date",
     value=TODAY,
-    min_value=MIN_DATE,
+    min_value=chart_spec.first_date,
     max_value=TODAY
 )
 
 if st.button("Get Chart"):
     date_str = get_effective_chart_date(selected_date)
 
-    with st.spinner(f"Fetching Billboard Hot 100 chart for **{date_str}**..."):
+    with st.spinner(f"Fetching {chart_spec.name} chart for **{date_str}**..."):
         try:
-            df = get_hot_100_chart_dataframe(date_str)
+            last_week_str = (selected_date - timedelta(days=7)).strftime("%Y-%m-%d")
+
+            # Download both weeks at the same time; the cached loaders below then read the archive
+            fetch_charts_concurrently([date_str, last_week_str], [chart_id])
+            df = load_chart_frame(date_str, chart_id)
+            df_last_week = load_chart_frame(last_week_str, chart_id)
 
-            last_week_date = selected_date - timedelta(days=7)
-            df_last_week = get_hot_100_chart_dataframe(last_week_date.strftime("%Y-%m-%d"))
+            # Warm the weeks the user is likely to step to next: the following week and the
+            # week before last week (needed as the "last week" of the previous chart)
+            prefetch_charts(get_adjacent_chart_dates(date_str, offsets=(-2, 1)), chart_id)
 
             if not df.empty:
                 st.session_state.df = df
                 st.session_state.df_last_week = df_last_week
                 st.session_state.chart_date = date_str
-                st.success(f"✅ Chart data for **{date_str}** successfully loaded!")
+                st.session_state.chart_id = chart_id
+                st.success(f"✅ {chart_spec.name} data for **{date_str}** successfully loaded!")
             else:
                 st.warning("The selected chart data could not be retrieved or is empty.")
 
@@ -101,4 +122,10 @@ if st.button("Get Chart"):
 
 # Display success message if data is loaded
 if not st.session_state.df.empty:
-    st.info(f"Data for **{st.session_state.chart_date}** is ready. Navigate to the pages on the left sidebar.")
\ No newline at end of file
+    loaded_name = CHARTS[st.session_state.chart_id].name
+    st.info(
+        f"{loaded_name} data for **{st.session_state.chart_date}** is ready. "
+        "Navigate to the pages on the left sidebar."
+    )
+
+report_page_metrics()
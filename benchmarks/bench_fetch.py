@@ -0,0 +1,136 @@
+"""
+Checks the fetch layer against the local fixture server with injected faults.
+
+    python -m benchmarks.bench_fetch
+
+Each scenario starts its own fixture server (benchmarks/fixture_server.py), fetches
+chart pages through util.fetch_util and checks the outcome: compressed downloads,
+raw cache hits, 304 revalidation, retries through failures, timeouts on a slow
+server, the retry budget during an outage, and errors on bad statuses and empty
+pages. It reports the server requests and wall time of each scenario and exits 1 if
+any check fails. Everything runs against a throwaway archive and raw page cache.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+
+# The archive and raw cache paths are read at import time
+_TMP = tempfile.mkdtemp(prefix="bench-fetch-")
+os.environ["BILLBOARD_ARCHIVE_PATH"] = os.path.join(_TMP, "charts.sqlite3")
+os.environ["BILLBOARD_RAW_CACHE_PATH"] = os.path.join(_TMP, "raw_pages.sqlite3")
+
+import requests  # noqa: E402
+
+from benchmarks.fixture_server import Faults, get_base_url, start_server  # noqa: E402
+from util.backfill import get_chart_weeks  # noqa: E402
+from util.chart_util import fetch_chart_html  # noqa: E402
+from util.fetch_util import RetryBudget, create_session  # noqa: E402
+
+WEEKS = get_chart_weeks(date(2000, 1, 1), date(2000, 12, 31))
+
+
+def _fetch_all(weeks, session, base_url) -> tuple[int, list[Exception]]:
+    decoded, errors = 0, []
+    for week in weeks:
+        try:
+            decoded += len(fetch_chart_html(week, session, base_url))
+        except Exception as e:
+            errors.append(e)
+    return decoded, errors
+
+# ==============================================================================
+# SCENARIOS
+# ==============================================================================
+# Each one returns (passed, detail) and may use its server's counters
+
+def check_download_and_cache(server, session):
+    base_url = get_base_url(server)
+    decoded, errors = _fetch_all(WEEKS[:20], session, base_url)
+    downloaded = server.requests
+    _, cached_errors = _fetch_all(WEEKS[:20], session, base_url)
+    passed = not errors and not cached_errors and downloaded == 20 and server.requests == 20
+    ratio = server.bytes_sent / decoded if decoded else 0
+    return passed, f"20 pages, {ratio:.0%} of the bytes on the wire, refetch served from the raw cache"
+
+
+def check_revalidation(server, session):
+    base_url = get_base_url(server)
+    today = date.today().strftime("%Y-%m-%d")
+    first = fetch_chart_html(today, session, base_url)
+    second = fetch_chart_html(today, session, base_url)
+    return first == second and server.statuses[304] == 1, "current week re-requested: 304 Not Modified"
+
+
+def check_retries(server, session):
+    _, errors = _fetch_all(WEEKS[:10], session, get_base_url(server))
+    return not errors and server.requests == 30, "every page failed twice, then succeeded"
+
+
+def check_timeout(server, session):
+    started = time.perf_counter()
+    _, errors = _fetch_all(WEEKS[:1], session, get_base_url(server))
+    elapsed = time.perf_counter() - started
+    passed = len(errors) == 1 and isinstance(errors[0], requests.ConnectionError) and elapsed < 3
+    return passed, f"gave up after {elapsed:.1f} s on a server that needs 2 s per response"
+
+
+def check_budget(server, session):
+    _, errors = _fetch_all(WEEKS[:50], session, get_base_url(server))
+    passed = len(errors) == 50 and server.requests < 70
+    return passed, f"{server.requests} requests for 50 pages (up to 300 without a budget)"
+
+
+def check_error_status(server, session):
+    _, errors = _fetch_all(WEEKS[:1], session, get_base_url(server))
+    passed = len(errors) == 1 and isinstance(errors[0], requests.HTTPError)
+    return passed, f"raised {type(errors[0]).__name__ if errors else 'nothing'} on a 404"
+
+
+def check_empty_page(server, session):
+    _, errors = _fetch_all(WEEKS[:1], session, get_base_url(server))
+    passed = len(errors) == 1 and isinstance(errors[0], ValueError)
+    return passed, f"raised {type(errors[0]).__name__ if errors else 'nothing'} on an empty 200"
+
+
+SCENARIOS = [
+    ("download + raw cache", Faults(), {}, check_download_and_cache),
+    ("conditional revalidation", Faults(), {}, check_revalidation),
+    ("flaky server", Faults(fail_first=2), {"retries": 3, "backoff": 0, "budget": RetryBudget(1.0, 20)}, check_retries),
+    ("slow server", Faults(delay=2.0), {"retries": 1, "backoff": 0, "timeout": (1, 0.5)}, check_timeout),
+    ("outage", Faults(fail_rate=1.0), {"retries": 5, "backoff": 0, "budget": RetryBudget(0.2, 5)}, check_budget),
+    ("error status", Faults(fail_first=1, fail_status=404), {}, check_error_status),
+    ("empty page", Faults(empty_rate=1.0), {}, check_empty_page),
+]
+
+
+def main() -> int:
+    print(f"{'scenario':<28}{'result':<8}{'requests':>10}{'seconds':>10}  detail")
+    failures = 0
+    try:
+        for name, faults, session_options, check in SCENARIOS:
+            server = start_server(0, faults)
+            session = create_session(1, **session_options)
+            started = time.perf_counter()
+            try:
+                passed, detail = check(server, session)
+            except Exception as e:
+                passed, detail = False, f"{type(e).__name__}: {e}"
+            finally:
+                session.close()
+                server.shutdown()
+                server.server_close()
+            failures += not passed
+            print(
+                f"{name:<28}{'ok' if passed else 'FAIL':<8}{server.requests:>10}"
+                f"{time.perf_counter() - started:>10.2f}  {detail}"
+            )
+    finally:
+        shutil.rmtree(_TMP, ignore_errors=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Compares the chart parser backends on fixture pages.
+
+    python -m benchmarks.bench_parsers --repeat 20
+
+Every backend must return exactly the same entries as the app's original BeautifulSoup
+parser (benchmarks/reference_parser.py); a mismatch is reported and makes the script
+exit with status 1. Saved billboard.com pages in benchmarks/fixtures are used when
+there are any (capture one with `python -m benchmarks.fixtures <chart-date>`), else
+synthetic pages with the same row markup.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+from benchmarks.fixtures import FIXTURES_DIR, make_chart_page
+from benchmarks.reference_parser import parse_reference
+from ChartData import ChartData
+from util.chart_parsers import PARSERS, is_parser_available
+
+
+def load_fixture_pages() -> dict[str, bytes]:
+    """Saved pages from benchmarks/fixtures, or synthetic pages if none are saved."""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        with open(path, "rb") as f:
+            pages[os.path.basename(path)] = f.read()
+    if not pages:
+        for chart_date in ["1985-03-02", "2003-07-05", "2024-06-01"]:
+            pages[f"synthetic {chart_date}"] = make_chart_page(chart_date)
+    return pages
+
+
+def to_rows(chart: ChartData) -> list[dict[str, any]]:
+    """A parsed chart as the row dicts the reference parser returns."""
+    columns = chart.to_dict()
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    for row in rows:
+        row["Last Week"] = row["Last Week"] or None
+    return rows
+
+
+def time_parser(parse, html: bytes, repeat: int) -> float:
+    """Median wall time of one parse, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(html)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the chart parser backends.")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    backends = [name for name in PARSERS if is_parser_available(name)]
+    mismatches = 0
+    pages = load_fixture_pages()
+    if all(name.startswith("synthetic") for name in pages):
+        print(
+            "No saved billboard.com pages in benchmarks/fixtures; checking synthetic pages only.",
+            file=sys.stderr
+        )
+
+    print(f"{'page':<28}" + "".join(f"{name:>12}" for name in backends) + "   (median ms)")
+    for page_name, html in pages.items():
+        reference = parse_reference(html)
+        row = f"{page_name:<28}"
+        for name in backends:
+            if to_rows(PARSERS[name](html)) != reference:
+                mismatches += 1
+                print(f"  {name} output differs from the original parser on {page_name}", file=sys.stderr)
+            row += f"{time_parser(PARSERS[name], html, args.repeat):>12.2f}"
+        print(row)
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
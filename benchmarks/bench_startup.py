@@ -0,0 +1,114 @@
+"""
+Cold-start time of every page, each measured in a fresh interpreter.
+
+    python -m benchmarks.bench_startup --repeat 3
+
+For each page the script reports the median time to import its modules and finish
+its first run (what a visitor waits through after a container cold start), and which
+heavy optional dependencies that first run pulled in. Pages run against an empty
+temporary archive, so nothing is fetched. Every page is measured twice: cold, and with
+a fixture chart already loaded into the session as Home leaves it, so pages that only
+render their tables and controls for a loaded chart are covered too.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import pickle
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries a page should only load when it really needs them
+HEAVY_MODULES = ["requests", "bs4", "lxml", "altair", "xlsxwriter"]
+
+CASES = ["cold", "loaded"]
+
+RUN_PAGE = """
+import json, pickle, sys, time
+from streamlit.testing.v1 import AppTest
+
+app = AppTest.from_file(sys.argv[1], default_timeout=60)
+if sys.argv[2] != "-":
+    with open(sys.argv[2], "rb") as f:
+        for key, value in pickle.load(f).items():
+            app.session_state[key] = value
+
+preloaded = set(sys.modules)
+start = time.perf_counter()
+app.run()
+elapsed = time.perf_counter() - start
+loaded = [m for m in sys.argv[3:] if m in sys.modules and m not in preloaded]
+print(json.dumps({"ms": elapsed * 1000, "loaded": loaded}))
+"""
+
+
+def list_pages() -> list[str]:
+    return ["Home.py"] + sorted(
+        os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, "pages", "*.py"))
+    )
+
+
+def save_loaded_session(path: str):
+    """Pickles the session state Home leaves behind after loading a fixture week and the week before."""
+    from benchmarks.bench_parsers import load_fixture_pages
+    from util.chart_parsers import PARSERS
+    from util.viz_util import add_change_columns
+
+    pages = list(load_fixture_pages().values())
+    df, df_last_week = (
+        add_change_columns(PARSERS["stream"](html).to_dataframe()) for html in (pages + pages)[:2]
+    )
+    with open(path, "wb") as f:
+        pickle.dump({"df": df, "df_last_week": df_last_week, "chart_date": "2021-05-08", "chart_id": "hot-100"}, f)
+
+
+def run_page(page: str, archive_path: str, session_path: str | None = None) -> dict:
+    """
+    Runs one page in a new interpreter, optionally with the pickled session state at
+    session_path, and returns its first-run time and loaded heavy modules.
+    """
+    env = dict(os.environ, BILLBOARD_ARCHIVE_PATH=archive_path)
+    output = subprocess.run(
+        [sys.executable, "-c", RUN_PAGE, os.path.join(ROOT, page), session_path or "-", *HEAVY_MODULES],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the cold-start time of every page.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    print(f"{'page':<36}{'case':<8}{'median ms':>12}  heavy modules loaded")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        archive_path = os.path.join(tmp, "charts.sqlite3")
+        session_path = os.path.join(tmp, "session.pkl")
+        save_loaded_session(session_path)
+        for page in list_pages():
+            for case in CASES:
+                runs = [
+                    run_page(page, archive_path, session_path if case == "loaded" else None)
+                    for _ in range(args.repeat)
+                ]
+                result = {"median_ms": statistics.median(r["ms"] for r in runs), "loaded": runs[-1]["loaded"]}
+                results[f"{page}[{case}]"] = result
+                print(
+                    f"{os.path.basename(page):<36}{case:<8}{result['median_ms']:>12.0f}"
+                    f"  {', '.join(result['loaded']) or '-'}"
+                )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Local stand-in for billboard.com that serves fixture chart pages.
+
+    python -m benchmarks.fixture_server --port 8000
+    BILLBOARD_BASE_URL=http://127.0.0.1:8000/charts python -m util.backfill ...
+
+Every chart in util.chart_registry is served at /charts/<slug>/<date> with its number
+of rows. Like the real site it sends ETag and Last-Modified headers, answers conditional
+requests with 304 and gzips pages for clients that accept it. Faults can be injected
+to exercise timeouts and retries:
+
+    python -m benchmarks.fixture_server --delay 2 --fail-first 2 --fail-rate 0.1 --empty-rate 0.05
+"""
+import argparse
+import gzip
+import hashlib
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import load_chart_page
+from util.chart_registry import CHARTS
+
+# Pages never change while the server runs
+LAST_MODIFIED = formatdate(0, usegmt=True)
+
+
+@dataclass
+class Faults:
+    delay: float = 0.0          # seconds to wait before every response
+    fail_first: int = 0         # answer the first N requests of every path with fail_status
+    fail_rate: float = 0.0      # share of the other requests answered with fail_status
+    fail_status: int = 503
+    empty_rate: float = 0.0     # share of requests answered with an empty 200 page
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        faults = server.faults
+        with server.lock:
+            server.hits[self.path] += 1
+            hits = server.hits[self.path]
+            roll = server.rng.random()
+
+        if faults.delay:
+            time.sleep(faults.delay)
+        if hits <= faults.fail_first or roll < faults.fail_rate:
+            return self._send(faults.fail_status, b"<html><body>Service unavailable</body></html>")
+        if roll < faults.fail_rate + faults.empty_rate:
+            return self._send(200, b"")
+
+        chart_id, chart_date = self.path.rstrip("/").split("/")[-2:]
+        spec = CHARTS.get(chart_id)
+        body = load_chart_page(chart_date, spec.size if spec else 100, chart_id)
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            return self._send(304, b"", {"ETag": etag})
+
+        headers = {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        self._send(200, body, headers)
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None):
+        with self.server.lock:
+            self.server.statuses[status] += 1
+            self.server.bytes_sent += len(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, faults: Faults | None = None, seed: int = 0):
+        super().__init__(address, FixtureHandler)
+        self.faults = faults or Faults()
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.hits: Counter[str] = Counter()
+        self.statuses: Counter[int] = Counter()
+        self.bytes_sent = 0
+
+    def handle_error(self, request, client_address):
+        # Clients that gave up on a slow response are expected, not errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.hits.values())
+
+
+def start_server(port: int = 0, faults: Faults | None = None) -> FixtureServer:
+    """Starts the fixture server on a background thread. Port 0 picks a free port."""
+    server = FixtureServer(("127.0.0.1", port), faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/charts"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before every response")
+    parser.add_argument("--fail-first", type=int, default=0, help="fail the first N requests of every path")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--empty-rate", type=float, default=0.0, help="share of requests given an empty page")
+    args = parser.parse_args()
+
+    server = FixtureServer(("127.0.0.1", args.port), Faults(
+        args.delay, args.fail_first, args.fail_rate, args.fail_status, args.empty_rate
+    ))
+    print(f"Serving fixture charts at {get_base_url(server)}")
+    server.serve_forever()
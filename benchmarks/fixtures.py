@@ -0,0 +1,159 @@
+"""
+Billboard-like chart pages for offline runs.
+
+Saved pages live in benchmarks/fixtures/<chart-date>.html (use `save_fixture` to
+capture a real one). When no saved page exists, `make_chart_page` renders a synthetic
+page with the same row markup as billboard.com so the parser and the pipeline can
+be exercised without the network.
+"""
+import argparse
+import html
+import os
+import random
+
+import requests
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+WORDS = [
+    "Love", "Night", "Heart", "Summer", "Baby", "Dance", "Fire", "Dream", "Gold", "Rain",
+    "City", "Girl", "Boy", "Blue", "Wild", "Forever", "Don't", "Stop", "Runaway", "Lights",
+    "Money", "Tonight", "Home", "Better", "Crazy", "Sweet", "Thunder", "Angel", "Shake", "Time"
+]
+NAMES = [
+    "Taylor Swift", "Drake", "Morgan Wallen", "SZA", "Bad Bunny", "The Weeknd", "Doja Cat",
+    "Post Malone", "Olivia Rodrigo", "Zach Bryan", "Beyonce", "Kendrick Lamar", "Future",
+    "Metro Boomin", "21 Savage", "Sabrina Carpenter", "Hall & Oates", "Earth, Wind & Fire",
+    "Simon & Garfunkel", "Tyler, The Creator", "Peso Pluma", "Luke Combs", "Miley Cyrus",
+    "Jelly Roll", "Lil Baby", "Travis Scott", "Ariana Grande", "Chris Stapleton", "Karol G", "Jung Kook"
+]
+
+ROW_TEMPLATE = """
+<div class="o-chart-results-list-row-container">
+<ul class="o-chart-results-list-row // lrv-a-unstyle-list lrv-u-flex u-height-97 lrv-u-align-items-center lrv-u-border-b-1 u-border-b-0@mobile-max lrv-u-border-color-grey-light">
+<li class="o-chart-results-list__item // lrv-u-background-color-black lrv-u-color-white u-width-100 u-width-55@mobile-max u-width-55@tablet-only lrv-u-height-100p lrv-u-flex lrv-u-flex-direction-column@mobile-max lrv-u-flex-shrink-0 lrv-u-align-items-center lrv-u-justify-content-center lrv-u-border-b-1 u-border-b-0@mobile-max lrv-u-border-color-grey">
+<span class="c-label  a-font-primary-bold-l u-font-size-32@tablet u-letter-spacing-0080@tablet">
+	{rank}
+</span>
+</li>
+<li class="lrv-u-width-100p">
+<ul class="lrv-a-unstyle-list lrv-u-flex lrv-u-height-100p lrv-u-flex-direction-column@mobile-max">
+<li class="o-chart-results-list__item // lrv-u-flex-grow-1 lrv-u-flex lrv-u-flex-direction-column lrv-u-justify-content-center lrv-u-border-b-1 u-border-b-0@mobile-max lrv-u-border-color-grey-light lrv-u-padding-l-050 lrv-u-padding-l-1@mobile-max">
+<h3 id="title-of-a-story" class="c-title  a-no-trucate a-font-primary-bold-s u-letter-spacing-0021 lrv-u-font-size-18@tablet lrv-u-font-size-16 u-line-height-125 u-line-height-normal@mobile-max a-truncate-ellipsis u-max-width-330 u-max-width-230@tablet-only">
+	{title}
+</h3>
+<span class="c-label  a-no-trucate a-font-primary-s lrv-u-font-size-14@mobile-max u-line-height-normal@mobile-max u-letter-spacing-0021 lrv-u-display-block a-truncate-ellipsis-2line u-max-width-330 u-max-width-230@tablet-only">
+	{artists}
+</span>
+</li>
+<li class="o-chart-results-list__item // a-chart-color u-width-72 u-width-55@mobile-max u-width-55@tablet-only lrv-u-flex lrv-u-flex-shrink-0 lrv-u-align-items-center lrv-u-justify-content-center lrv-u-border-b-1 u-border-b-0@mobile-max lrv-u-border-color-grey-light u-background-color-white-064@mobile-max u-hidden@mobile-max">
+<span class="c-label  a-font-primary-m lrv-u-padding-tb-050@mobile-max u-font-size-12 u-font-size-16@tablet">LW</span>
+<span class="c-label  a-font-primary-m lrv-u-padding-tb-050@mobile-max u-font-size-12 u-font-size-16@tablet">
+	{last_week}
+</span>
+</li>
+<li class="o-chart-results-list__item // a-chart-color u-width-72 u-width-55@mobile-max u-width-55@tablet-only lrv-u-flex lrv-u-flex-shrink-0 lrv-u-align-items-center lrv-u-justify-content-center lrv-u-border-b-1 u-border-b-0@mobile-max lrv-u-border-color-grey-light u-background-color-white-064@mobile-max u-hidden@mobile-max">
+<span class="c-label  a-font-primary-m lrv-u-padding-tb-050@mobile-max u-font-size-12 u-font-size-16@tablet">PEAK</span>
+<span class="c-label  a-font-primary-m lrv-u-padding-tb-050@mobile-max u-font-size-12 u-font-size-16@tablet">
+	{peak}
+</span>
+</li>
+<li class="o-chart-results-list__item // a-chart-color u-width-72 u-width-55@mobile-max u-width-55@tablet-only lrv-u-flex lrv-u-flex-shrink-0 lrv-u-align-items-center lrv-u-justify-content-center lrv-u-border-b-1 u-border-b-0@mobile-max lrv-u-border-color-grey-light u-background-color-white-064@mobile-max u-hidden@mobile-max">
+<span class="c-label  a-font-primary-m lrv-u-padding-tb-050@mobile-max u-font-size-12 u-font-size-16@tablet">WKS</span>
+<span class="c-label  a-font-primary-m lrv-u-padding-tb-050@mobile-max u-font-size-12 u-font-size-16@tablet">
+	{weeks}
+</span>
+</li>
+</ul>
+</li>
+</ul>
+</div>
+"""
+
+PAGE_FILLER = "".join(
+    f'<li class="c-nav-item"><a class="c-link" href="/charts/{i}">Chart {i} &amp; more</a></li>\n'
+    for i in range(400)
+)
+
+
+def fixture_path(chart_date: str) -> str:
+    return os.path.join(FIXTURES_DIR, f"{chart_date}.html")
+
+
+def save_fixture(chart_date: str, base_url: str = "https://www.billboard.com/charts/hot-100") -> str:
+    """Downloads a real chart page into the fixtures directory and returns its path."""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    path = fixture_path(chart_date)
+    response = requests.get(f"{base_url}/{chart_date}", timeout=30)
+    response.raise_for_status()
+    with open(path, "wb") as f:
+        f.write(response.content)
+    return path
+
+
+def _make_artists(rng: random.Random) -> str:
+    """Renders an artist credit the way billboard.com does: plain text or linked names."""
+    a, b, c = (html.escape(n) for n in rng.sample(NAMES, 3))
+    style = rng.randrange(6)
+    if style == 0:
+        return a
+    if style == 1:
+        return f"{a} Featuring {b}"
+    if style == 2:
+        return f'<a href="/artist/a">{a}</a> &amp; <a href="/artist/b">{b}</a>'
+    if style == 3:
+        return f'<a href="/artist/a">{a}</a> Featuring <a href="/artist/b">{b}</a> &amp; <a href="/artist/c">{c}</a>'
+    if style == 4:
+        return f'<a href="/artist/a">{a}</a> X <a href="/artist/b">{b}</a>'
+    return f'<a href="/artist/a">{a}</a> With <a href="/artist/b">{b}</a>'
+
+
+def make_chart_page(chart_date: str, rows: int = 100, chart_id: str = "hot-100") -> bytes:
+    """Renders a deterministic synthetic chart_id page for chart_date with the given number of rows."""
+    rng = random.Random(chart_date if chart_id == "hot-100" else f"{chart_id}/{chart_date}")
+    # Like a real chart, a week lists every song once (util.chart_util.validate_chart)
+    titles = set()
+    body = []
+    for rank in range(1, rows + 1):
+        total_weeks = rng.choice([1, 1, 2, 3, 5, 8, 12, 20, 33, 48, 61])
+        if total_weeks == 1 or rng.random() < 0.05:
+            last_week = "-"
+            peak = rank if total_weeks == 1 else rng.randint(1, rank)
+        else:
+            last_week = str(max(1, min(rows, rank + rng.randint(-25, 25))))
+            peak = rng.randint(1, min(rank, int(last_week)))
+        title = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+        while title in titles:
+            title = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+        titles.add(title)
+        body.append(ROW_TEMPLATE.format(
+            rank=rank, title=html.escape(title), artists=_make_artists(rng),
+            last_week=last_week, peak=peak, weeks=total_weeks
+        ))
+
+    page = (
+        "<!DOCTYPE html><html><head><title>Billboard Hot 100</title>"
+        "<script>window.__DATA__ = {\"chart\": \"hot-100\"};</script></head><body>"
+        f"<nav><ul>{PAGE_FILLER}</ul></nav>"
+        f'<div class="chart-results-list">{"".join(body)}</div>'
+        f"<footer><ul>{PAGE_FILLER}</ul></footer></body></html>"
+    )
+    return page.encode("utf-8")
+
+
+def load_chart_page(chart_date: str, rows: int = 100, chart_id: str = "hot-100") -> bytes:
+    """Returns the saved Hot 100 fixture for chart_date if there is one, else a synthetic page."""
+    path = fixture_path(chart_date)
+    if chart_id == "hot-100" and os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    return make_chart_page(chart_date, rows, chart_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Save real billboard.com chart pages as fixtures.")
+    parser.add_argument("chart_dates", nargs="+", help="chart dates (YYYY-MM-DD) to download")
+    args = parser.parse_args()
+
+    for chart_date in args.chart_dates:
+        print(f"Saved {save_fixture(chart_date)}")
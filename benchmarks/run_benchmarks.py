@@ -0,0 +1,160 @@
+"""
+Offline benchmarks for the fetch -> parse -> frame -> viz -> table pipeline.
+
+    python -m benchmarks.run_benchmarks                       # report
+    python -m benchmarks.run_benchmarks --save-baseline       # store benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --scale 1,10,100,1000 # grow frame inputs to N weeks
+
+Each stage reports its median latency and the peak memory it allocated (tracemalloc).
+When a baseline exists, a stage more than --tolerance slower than its baseline is
+reported as a regression and the script exits with status 1. Baselines are machine
+specific, so save one on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.bench_parsers import load_fixture_pages
+from ChartData import ChartData
+from util.category_util import build_chart_sections
+from util.chart_parsers import PARSERS, is_parser_available
+from util.export_util import export_sheets, is_format_available
+from util.viz_util import (
+    add_change_columns,
+    get_peak_vs_weeks_data,
+    get_peak_vs_weeks_density_data,
+    get_position_change_distribution_data,
+    get_position_change_histogram_data,
+    get_week_distribution_data
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# ==============================================================================
+# 1. MEASUREMENT
+# ==============================================================================
+
+def measure(fn, repeat: int) -> dict[str, float]:
+    """Median wall time (ms) over repeat runs, and peak traced memory (KiB) of one extra run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"median_ms": statistics.median(timings), "peak_kib": peak / 1024}
+
+
+def scale_frame(df: pd.DataFrame, weeks: int) -> pd.DataFrame:
+    """Stacks weeks copies of one weekly frame, as a multi-week range would look."""
+    if weeks == 1:
+        return df
+    return pd.concat([df] * weeks, ignore_index=True)
+
+# ==============================================================================
+# 2. STAGES
+# ==============================================================================
+
+def get_stages(html: bytes, weeks: int) -> dict[str, callable]:
+    """Stage name -> zero-argument callable. Frame stages run on weeks stacked copies."""
+    chart = PARSERS["bs4"](html)
+    stored = chart.to_dict()
+    df = add_change_columns(scale_frame(chart.to_dataframe(), weeks))
+    raw_df = df.drop(columns=["Change Category", "Change Int"])
+    df_last_week = df.sample(frac=1.0, random_state=0)
+    sections = build_chart_sections(df, df_last_week)
+    sheets = {name: data for name, data in sections.items() if not data.empty}
+
+    stages = {}
+    if weeks == 1:
+        for name in PARSERS:
+            if is_parser_available(name):
+                stages[f"parse[{name}]"] = lambda name=name: PARSERS[name](html)
+        stages["chartdata.from_dict"] = lambda: ChartData.from_dict(stored)
+        stages["chartdata.to_dataframe"] = lambda: chart.to_dataframe()
+
+    stages["frame.add_change_columns"] = lambda: add_change_columns(raw_df.copy())
+    stages["viz.week_distribution"] = lambda: get_week_distribution_data(df)
+    stages["viz.peak_vs_weeks"] = lambda: get_peak_vs_weeks_data(df)
+    stages["viz.position_change"] = lambda: get_position_change_distribution_data(df)
+    plot_data = get_peak_vs_weeks_data(df)
+    change_data = get_position_change_distribution_data(df)
+    stages["viz.peak_vs_weeks_density"] = lambda: get_peak_vs_weeks_density_data(plot_data)
+    stages["viz.position_change_histogram"] = lambda: get_position_change_histogram_data(change_data, 5)
+    stages["table.build_sections"] = lambda: build_chart_sections(df, df_last_week)
+    stages["export[csv.zip]"] = lambda: export_sheets(sheets, "csv.zip")
+    if is_format_available("xlsx") and weeks <= 100:
+        stages["export[xlsx]"] = lambda: export_sheets(sheets, "xlsx")
+    if is_format_available("parquet"):
+        stages["export[parquet]"] = lambda: export_sheets(sheets, "parquet")
+    return stages
+
+# ==============================================================================
+# 3. REPORTING
+# ==============================================================================
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for key, result in results.items():
+        if key in baseline and result["median_ms"] > baseline[key]["median_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{key}: {result['median_ms']:.2f} ms vs baseline {baseline[key]['median_ms']:.2f} ms"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the chart pipeline on offline fixtures.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", default="1,10,100", help="comma-separated numbers of weeks")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown, 0.5 = 50%%")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    page_name, html = next(iter(load_fixture_pages().items()))
+    print(f"Fixture: {page_name}")
+    print(f"{'stage':<32}{'weeks':>7}{'median ms':>12}{'peak KiB':>12}")
+
+    results = {}
+    for weeks in [int(w) for w in args.scale.split(",")]:
+        for stage, fn in get_stages(html, weeks).items():
+            result = measure(fn, args.repeat)
+            results[f"{stage}@{weeks}"] = result
+            print(f"{stage:<32}{weeks:>7}{result['median_ms']:>12.2f}{result['peak_kib']:>12.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline).")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,9 @@
 import streamlit as st
+from datetime import date
+from util.chart_registry import CHARTS, DEFAULT_CHART
+from util.history_store import is_history_store_current, open_history_store
+from util.perf_util import report_page_metrics
+from util.viz_util import add_change_columns
 from viz import (
     plot_peak_vs_weeks,
     plot_position_change_histogram,
@@ -9,14 +14,8 @@ st.set_page_config(page_title="Charts", layout="wide")
 
 st.title("📊 Chart Visualizations")
 
-# Check if data is available in session state
-if st.session_state.df.empty:
-    st.error("Please select a date and click 'Get Chart' on the home page.")
-else:
-    df = st.session_state.df
-    df_last_week = st.session_state.df_last_week
-    st.markdown(f"### Data for Chart Date: {st.session_state.chart_date}")
-    
+
+def show_plots(df):
     plot_total_weeks_distribution(df)
     st.divider()
 
@@ -24,4 +23,46 @@ else:
     st.divider()
 
     plot_position_change_histogram(df)
-    st.divider()
\ No newline at end of file
+    st.divider()
+
+
+def show_loaded_week():
+    if st.session_state.df.empty:
+        st.error("Please select a date and click 'Get Chart' on the home page.")
+        return
+
+    chart_name = CHARTS[st.session_state.get("chart_id", DEFAULT_CHART)].name
+    st.markdown(f"### {chart_name} Data for Chart Date: {st.session_state.chart_date}")
+    show_plots(st.session_state.df)
+
+
+def show_date_range():
+    # Ranges are read straight from the memory-mapped history store, not copied into a cache
+    store = open_history_store()
+    if store is None or len(store) == 0:
+        st.error("The history store has not been built yet. Run `python -m util.history_store` first.")
+        return
+    if not is_history_store_current():
+        st.warning("The history store is older than the archive; the latest weeks may be missing.")
+
+    first, last = store.dates[0].item(), store.dates[-1].item()
+    col1, col2 = st.columns(2)
+    start = col1.date_input("From", value=max(first, date(last.year - 9, 1, 1)), min_value=first, max_value=last)
+    end = col2.date_input("To", value=last, min_value=first, max_value=last)
+    if start > end:
+        st.warning("The start date must be before the end date.")
+        return
+
+    df = add_change_columns(store.get_range(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")))
+    st.markdown(f"### {CHARTS[DEFAULT_CHART].name} from {start} to {end}: {df['Chart Date'].nunique()} weeks")
+    st.caption("Every chart entry counts once per week it was on the chart. Large ranges are binned before plotting.")
+    show_plots(df)
+
+
+view = st.radio("View", ["Loaded week", "Date range"], horizontal=True)
+if view == "Loaded week":
+    show_loaded_week()
+else:
+    show_date_range()
+
+report_page_metrics()
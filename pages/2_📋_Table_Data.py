@@ -1,6 +1,9 @@
 import streamlit as st
+from util.chart_registry import CHARTS, DEFAULT_CHART
+from util.perf_util import report_page_metrics
 import pandas as pd
-import io
+from util.export_util import EXPORT_FORMATS, export_sheets, is_format_available
+from util.category_util import build_chart_sections
 
 st.set_page_config(page_title="Table Data")
 
@@ -21,20 +24,59 @@ def show_section(title: str, df: pd.DataFrame) -> pd.DataFrame:
             st.dataframe(display_df.reset_index(drop=True), use_container_width=True, 
                          hide_index=True)
 
+def get_frame_version(df: pd.DataFrame) -> int:
+    """
+    Cheap fingerprint of a loaded week, so the caches below follow a reloaded current week
+    or a last week that failed to load instead of serving sections built from old frames.
+    """
+    if df.empty:
+        return 0
+    return int(pd.util.hash_pandas_object(df[["Rank", "Title", "Change"]], index=False).sum())
+
+@st.cache_data(max_entries=20)
+def export_chart_summary(chart_key: tuple, fmt: str, _sheets: dict[str, pd.DataFrame]) -> bytes:
+    """Builds the download file once per loaded chart and format (_sheets is not hashed)."""
+    return export_sheets(_sheets, fmt)
+
+def show_download_button(chart_key: tuple, sheets: dict[str, pd.DataFrame]):
+    formats = [fmt for fmt in EXPORT_FORMATS if is_format_available(fmt)]
+    fmt = st.radio("Download format", formats, horizontal=True)
+    extension, mime = EXPORT_FORMATS[fmt]
+    chart_id, chart_date = chart_key[:2]
+
+    # The file is only generated when the button is clicked
+    st.download_button(
+        label=f"📥 Download as {fmt}",
+        data=lambda: export_chart_summary(chart_key, fmt, sheets),
+        file_name=f"{chart_id}_summary_{chart_date}.{extension}",
+        mime=mime,
+        on_click="ignore"
+    )
+
+@st.cache_data(max_entries=20)
+def get_chart_sections(chart_key: tuple, _df: pd.DataFrame, _df_last_week: pd.DataFrame):
+    """Classifies the chart once per loaded chart (the frames themselves are not hashed)."""
+    return build_chart_sections(_df, _df_last_week)
+
 def filter_and_show_categories(df: pd.DataFrame, df_last_week: pd.DataFrame):
-    df_norm = df.drop(columns="Artists List")
+    # (chart, chart date, this week's version, last week's version)
+    chart_key = (
+        st.session_state.get("chart_id", DEFAULT_CHART), str(st.session_state.chart_date),
+        get_frame_version(df), get_frame_version(df_last_week)
+    )
+    sections = get_chart_sections(chart_key, df, df_last_week)
     
     sheets = {}
     
-    # --- TOP 100 ---
-    top_100 = df_norm.dropna(subset=['Rank'])
-    show_section("🏆 Top 100", top_100)
-    sheets["Top 100"] = top_100
+    # --- WHOLE CHART ---
+    chart_name = CHARTS[chart_key[0]].name
+    chart = sections["Chart"]
+    show_section(f"🏆 {chart_name}", chart)
+    # Excel sheet names and zip members can't contain '/' (Hot R&B/Hip-Hop Songs)
+    sheets[chart_name.replace("/", "-")] = chart
 
     # --- PEAKERS ---
-    peakers = df_norm.loc[
-        (df["Rank"] == df["Peak Position"]) & ~(df["Change"].isin(["=", "NEW"])), :
-    ].dropna(subset=['Rank', 'Peak Position'])
+    peakers = sections["Peakers"]
     show_section("⛰️ Peakers (New Peak or Re-Peak)", peakers)
     if peakers.empty:
         st.info("No peakers this week.")
@@ -42,41 +84,19 @@ def filter_and_show_categories(df: pd.DataFrame, df_last_week: pd.DataFrame):
         sheets["Peakers"] = peakers
     
     # --- TOP ARTISTS ---
-    artist_count = (
-        df.explode('Artists List')
-        .groupby('Artists List')
-        .agg(
-            No_Songs=('Rank', 'count'),
-            Best_Rank=('Rank', 'min'),           # Highest chart position
-            Median_Rank=('Rank', 'median'),
-        )
-        .reset_index()
-        .rename(columns={
-            'Artists List': 'Artist', 'No_Songs': 'No. Songs', 
-            'Median_Rank': 'Median Rank', 'Best_Rank': 'Best Rank'
-        })
-        .sort_values(['No. Songs', 'Best Rank', 'Median Rank'], 
-                   ascending=[False, True, True])
-    )
-    top_artists = artist_count[
-        (artist_count['No. Songs'] > 1) &
-        (artist_count['Artist'].str.len() > 1)
-    ]
+    top_artists = sections["Top Artists"]
     show_section("🎤 Top Artists", top_artists)
     sheets["Top Artists"] = top_artists
 
     # --- GAINERS & LOSERS ---
-    change_data = df_norm.copy()
-    change_data["Change Int"] = pd.to_numeric(change_data["Change"], errors="coerce")
-
-    big_gainers = change_data[change_data["Change Int"] >= 10].drop(columns="Change Int")
+    big_gainers = sections["Gainers"]
     if big_gainers.empty:
         st.info("No big gainers this week.")
     else:
         show_section("📈 Gainers (10+ Spots Up)", big_gainers)
         sheets["Gainers"] = big_gainers
 
-    big_losers = change_data[change_data["Change Int"] <= -10].drop(columns="Change Int")
+    big_losers = sections["Losers"]
     if big_losers.empty:
         st.info("No big losers this week.")
     else:
@@ -84,7 +104,7 @@ def filter_and_show_categories(df: pd.DataFrame, df_last_week: pd.DataFrame):
         sheets["Losers"] = big_losers
 
     # --- RE-ENTRIES ---
-    re_entries = df_norm[df["Change"] == "RE"].drop(columns=["Change", "Last Week"], errors='ignore')
+    re_entries = sections["Re-Entries"]
     show_section("🔁 Re-Entries This Week", re_entries)
     if re_entries.empty:
         st.info("No re-entries this week.")
@@ -92,9 +112,7 @@ def filter_and_show_categories(df: pd.DataFrame, df_last_week: pd.DataFrame):
         sheets["Re-Entries"] = re_entries
 
     # --- NEW ENTRIES ---
-    new_entries = df_norm[df["Change"] == "NEW"].drop(
-        columns=["Change", "Last Week", "Peak Position", "Total Weeks"], errors='ignore'
-    )
+    new_entries = sections["New Entries"]
     if new_entries.empty:
         st.info("No new entries this week.")
     else:
@@ -102,30 +120,14 @@ def filter_and_show_categories(df: pd.DataFrame, df_last_week: pd.DataFrame):
         sheets["New Entries"] = new_entries
 
     # --- DROPOUTS ---
-    dropouts = df_last_week[~df_last_week["Title"].isin(df["Title"])]\
-        [["Rank", "Title", "Artists", "Peak Position", "Total Weeks"]]
-    dropouts = dropouts.dropna(subset=['Rank'])
+    dropouts = sections["Dropouts"]
     if dropouts.empty:
         st.info("No dropouts this week.")
     else:
         show_section("🚪 Dropouts", dropouts)
         sheets["Dropouts"] = dropouts
     
-    output = io.BytesIO()
-
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        for sheet_name, data in sheets.items():
-            data.to_excel(writer, sheet_name=sheet_name[:31], index=False)  
-            # Excel sheet names max length = 31
-
-    output.seek(0)
-    
-    st.download_button(
-        label="📥 Download as Excel",
-        data=output,
-        file_name=f"chart_summary_{st.session_state.chart_date}.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    show_download_button(chart_key, sheets)
 
 
 # ==============================================================================
@@ -139,6 +141,9 @@ if st.session_state.df.empty:
 else:
     df = st.session_state.df
     df_last_week = st.session_state.df_last_week
-    st.markdown(f"### Data for Chart Date: {st.session_state.chart_date}")
+    chart_name = CHARTS[st.session_state.get("chart_id", DEFAULT_CHART)].name
+    st.markdown(f"### {chart_name} Data for Chart Date: {st.session_state.chart_date}")
+
+    filter_and_show_categories(df, df_last_week)
 
-    filter_and_show_categories(df, df_last_week)
\ No newline at end of file
+report_page_metrics()
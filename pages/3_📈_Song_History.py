@@ -0,0 +1,33 @@
+import streamlit as st
+from util.perf_util import report_page_metrics
+from util.song_index import get_song_history
+
+st.set_page_config(page_title="Song History", layout="wide")
+
+st.title("📈 Song History")
+
+# Check if data is available in session state
+if st.session_state.df.empty:
+    st.error("Please select a date and click 'Get Chart' on the home page.")
+else:
+    df = st.session_state.df
+    st.markdown(f"### Songs on the Chart for {st.session_state.chart_date}")
+
+    song_labels = [f"{row.Rank}. {row.Title} — {row.Artists}" for row in df.itertuples()]
+    selected = st.selectbox("Select a song", range(len(df)), format_func=lambda i: song_labels[i])
+    song = df.iloc[selected]
+
+    history = get_song_history(song["Title"], song["Artists"])
+
+    # Altair is only loaded once there is a chart to draw
+    from viz import plot_song_history
+    plot_song_history(history, song["Title"])
+
+    if not history.empty:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Weeks in Archive", len(history))
+        col2.metric("Best Rank", int(history["Rank"].min()))
+        col3.metric("First Archived Week", history["Chart Date"].min().strftime("%Y-%m-%d"))
+        st.caption("Song histories follow the Hot 100. Only weeks present in the local chart archive are shown.")
+
+report_page_metrics()
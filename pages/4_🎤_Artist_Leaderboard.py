@@ -0,0 +1,36 @@
+import streamlit as st
+from util.perf_util import report_page_metrics
+from datetime import date
+from util.artist_stats import get_artist_leaderboard
+from util.chart_store import list_chart_dates
+
+st.set_page_config(page_title="Artist Leaderboard", layout="wide")
+
+st.title("🎤 Artist Leaderboard")
+
+
+@st.cache_data(ttl=600)
+def load_leaderboard(start: str, end: str, limit: int):
+    return get_artist_leaderboard(start, end, limit)
+
+
+chart_dates = list_chart_dates()
+
+if not chart_dates:
+    st.error("The chart archive is empty. Load some charts on the home page or run a backfill first.")
+else:
+    first, last = date.fromisoformat(chart_dates[0]), date.fromisoformat(chart_dates[-1])
+    st.markdown(f"### Archive covers {len(chart_dates)} weeks from {first} to {last}")
+
+    col1, col2, col3 = st.columns(3)
+    start = col1.date_input("From", value=first, min_value=first, max_value=last)
+    end = col2.date_input("To", value=last, min_value=first, max_value=last)
+    limit = col3.number_input("Artists", min_value=10, max_value=1000, value=100, step=10)
+
+    if start > end:
+        st.warning("The start date must be before the end date.")
+    else:
+        leaderboard = load_leaderboard(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), int(limit))
+        st.dataframe(leaderboard, use_container_width=True, hide_index=True)
+
+report_page_metrics()
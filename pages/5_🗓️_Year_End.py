@@ -0,0 +1,42 @@
+import streamlit as st
+from util.perf_util import report_page_metrics
+from util.year_end import get_year_end_summary, list_summary_years
+
+st.set_page_config(page_title="Year-End Charts", layout="wide")
+
+st.title("🗓️ Year-End Charts")
+
+
+@st.cache_data(ttl=600)
+def load_summary(first_year: int, last_year: int, limit: int):
+    return get_year_end_summary(first_year, last_year, limit)
+
+
+years = list_summary_years()
+
+if not years:
+    st.error("The chart archive is empty. Load some charts on the home page or run a backfill first.")
+else:
+    col1, col2 = st.columns([3, 1])
+    if len(years) > 1:
+        first_year, last_year = col1.select_slider(
+            "Years", options=years, value=(years[-1], years[-1])
+        )
+    else:
+        first_year = last_year = years[0]
+        col1.markdown(f"### {first_year}")
+    limit = col2.number_input("Songs", min_value=10, max_value=500, value=100, step=10)
+
+    span = str(first_year) if first_year == last_year else f"{first_year}–{last_year}"
+    st.markdown(f"### Year-end rankings for {span}")
+    st.caption(
+        "Each week on the chart earns 101 minus its rank in points. "
+        "Only weeks present in the local chart archive are counted."
+    )
+
+    summary = load_summary(first_year, last_year, int(limit))
+    for tab, (name, board) in zip(st.tabs(list(summary)), summary.items()):
+        with tab:
+            st.dataframe(board, use_container_width=True, hide_index=True)
+
+report_page_metrics()
@@ -0,0 +1,27 @@
+import streamlit as st
+from util.perf_util import report_page_metrics
+from util.chart_store import list_chart_dates
+from util.search_index import search
+
+st.set_page_config(page_title="Search", layout="wide")
+
+st.title("🔎 Search the Archive")
+
+if not list_chart_dates():
+    st.error("The chart archive is empty. Load some charts on the home page or run a backfill first.")
+else:
+    query = st.text_input("Song or artist", placeholder="e.g. tay swi, beyonse, blinding lights")
+    limit = st.slider("Results", min_value=10, max_value=100, value=20, step=10)
+
+    if query.strip():
+        results = search(query, limit)
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            st.markdown("### Songs")
+            st.dataframe(results["Songs"], use_container_width=True, hide_index=True)
+        with col2:
+            st.markdown("### Artists")
+            st.dataframe(results["Artists"], use_container_width=True, hide_index=True)
+        st.caption("Words match as prefixes or close spellings. Only weeks present in the local chart archive are counted.")
+
+report_page_metrics()
@@ -0,0 +1,60 @@
+import streamlit as st
+from datetime import date
+from util.perf_util import report_page_metrics
+from util.chart_registry import CHARTS, DEFAULT_CHART
+from util.cross_chart import compare_charts
+from util.date_util import MIN_DATE, get_saturday_of_week, is_current_week
+
+st.set_page_config(page_title="Cross-Chart", layout="wide")
+
+st.title("🧭 Cross-Chart Comparison")
+
+
+@st.cache_data(ttl=600)
+def load_comparison(chart_str: str, chart_ids: tuple[str, ...]):
+    return compare_charts(chart_str, list(chart_ids))
+
+
+col1, col2 = st.columns([1, 3])
+selected_date = col1.date_input(
+    "Week",
+    value=date.fromisoformat(str(st.session_state.get("chart_date", date.today()))[:10]),
+    min_value=MIN_DATE,
+    max_value=date.today()
+)
+chart_ids = col2.multiselect(
+    "Charts",
+    options=list(CHARTS),
+    default=[DEFAULT_CHART, "r-b-hip-hop-songs", "country-songs"],
+    format_func=lambda chart_id: CHARTS[chart_id].name
+)
+
+if len(chart_ids) < 2:
+    st.info("Pick at least two charts to compare.")
+elif st.button("Compare"):
+    # The current week's charts are served under today's date, past weeks under their Saturday
+    if is_current_week(selected_date):
+        chart_str = selected_date.strftime("%Y-%m-%d")
+    else:
+        chart_str = get_saturday_of_week(selected_date)
+    st.session_state.cross_chart = (chart_str, tuple(chart_ids))
+
+if "cross_chart" in st.session_state:
+    chart_str, compared_ids = st.session_state.cross_chart
+    with st.spinner(f"Loading {len(compared_ids)} charts for **{chart_str}**..."):
+        comparison, errors = load_comparison(chart_str, compared_ids)
+
+    st.markdown(f"### Week of {chart_str}")
+
+    for name, error in errors.items():
+        st.warning(f"{name} could not be loaded: {error}")
+
+    only_shared = st.checkbox("Only entries on more than one chart", value=True)
+    for tab, (name, frame) in zip(st.tabs(list(comparison)), comparison.items()):
+        with tab:
+            if only_shared:
+                frame = frame[frame["Charts"] > 1]
+            st.dataframe(frame, use_container_width=True, hide_index=True)
+    st.caption("Songs match on normalized title and artists, artists on their canonical names. Ranks are per chart.")
+
+report_page_metrics()
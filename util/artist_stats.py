@@ -0,0 +1,110 @@
+"""
+Artist leaderboards over arbitrary date ranges.
+
+Each archived week is exploded into one row per (artist, song) once, when the week is
+synced; a range query then only aggregates those precomputed rows in SQLite.
+"""
+import pandas as pd
+
+from util.artist_util import canonical_artist_key
+from util.chart_store import connect, iter_unindexed_charts, mark_indexed
+from util.song_index import make_song_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artists (
+    artist_key TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artist_entries (
+    chart_date TEXT NOT NULL,
+    artist_key TEXT NOT NULL,
+    song_key TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    PRIMARY KEY (chart_date, artist_key, song_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS artist_entries_by_artist ON artist_entries (artist_key);
+CREATE TABLE IF NOT EXISTS artist_index_weeks (
+    chart_date TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+"""
+
+LEADERBOARD_COLUMNS = [
+    "Artist", "Total Weeks", "No. 1 Weeks", "Distinct Songs", "Chart Entries", "Best Rank", "Median Rank"
+]
+
+
+def _create_schema(conn) -> None:
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(artist_entries)")]
+    if columns and "artist_key" not in columns:
+        # Entries from before canonical artist keys: drop them so the next sync rebuilds them
+        conn.executescript("DROP TABLE artist_entries; DROP TABLE IF EXISTS artist_index_weeks;")
+    conn.executescript(SCHEMA)
+
+
+def sync_artist_index() -> int:
+    """Explodes the archived weeks that are new since the last sync. Returns how many were indexed."""
+    synced = 0
+    with connect() as conn:
+        _create_schema(conn)
+        for chart_date, fetched_at, chart in iter_unindexed_charts(conn, "artist_index_weeks"):
+            names = {}
+            rows = set()
+            for rank, title, artists, artists_list in zip(
+                    chart.ranks, chart.titles, chart.artists, chart.artists_lists):
+                song_key = make_song_key(title, artists)
+                for artist in artists_list:
+                    artist_key = canonical_artist_key(artist)
+                    names.setdefault(artist_key, artist)
+                    rows.add((chart_date, artist_key, song_key, rank))
+
+            # The first spelling seen for an artist becomes its display name
+            conn.executemany("INSERT OR IGNORE INTO artists (artist_key, name) VALUES (?, ?)", names.items())
+            conn.execute("DELETE FROM artist_entries WHERE chart_date = ?", (chart_date,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO artist_entries (chart_date, artist_key, song_key, rank) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            mark_indexed(conn, "artist_index_weeks", chart_date, fetched_at)
+            synced += 1
+    return synced
+
+
+def get_artist_leaderboard(start: str, end: str, limit: int = 100) -> pd.DataFrame:
+    """
+    Ranks artists over the chart weeks from start to end (inclusive 'YYYY-MM-DD'):
+    weeks with at least one song on the chart, weeks at No. 1, distinct songs,
+    total song-weeks, best rank and median rank.
+    """
+    sync_artist_index()
+    with connect() as conn:
+        totals = pd.read_sql_query("""
+            SELECT e.artist_key,
+                   a.name AS "Artist",
+                   COUNT(DISTINCT chart_date) AS "Total Weeks",
+                   COUNT(DISTINCT CASE WHEN rank = 1 THEN chart_date END) AS "No. 1 Weeks",
+                   COUNT(DISTINCT song_key) AS "Distinct Songs",
+                   COUNT(*) AS "Chart Entries",
+                   MIN(rank) AS "Best Rank"
+            FROM artist_entries e JOIN artists a ON a.artist_key = e.artist_key
+            WHERE chart_date BETWEEN ? AND ?
+            GROUP BY e.artist_key
+            ORDER BY "Total Weeks" DESC, "No. 1 Weeks" DESC, "Best Rank"
+            LIMIT ?
+        """, conn, params=(start, end, limit))
+
+        if totals.empty:
+            return pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+
+        # Medians don't merge, so read only the ranks of the artists on the board
+        placeholders = ",".join("?" * len(totals))
+        ranks = pd.read_sql_query(
+            f"SELECT artist_key, rank FROM artist_entries WHERE chart_date BETWEEN ? AND ? "
+            f"AND artist_key IN ({placeholders})",
+            conn, params=(start, end, *totals["artist_key"])
+        )
+
+    medians = ranks.groupby("artist_key")["rank"].median()
+    totals["Median Rank"] = totals["artist_key"].map(medians)
+    return totals[LEADERBOARD_COLUMNS]
@@ -0,0 +1,108 @@
+"""
+Artist credit splitting and canonical artist keys.
+
+The same credit strings come back week after week, so splitting is memoized on the
+raw credit segments, and the rules are compiled once at import time.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+# ==============================================================================
+# 1. RULES
+# ==============================================================================
+
+ARTIST_CACHE_SIZE = 65536
+
+FEAT_PATTERN = re.compile(r'\b(?:featuring|ft\.)\b', re.IGNORECASE)
+
+# Leftover connector tokens that are not artists
+RESTRICTED_TOKENS = frozenset(["With", "X", "x", ",", "&"])
+
+# Spellings that normalization alone does not merge: normalized form -> canonical form
+ARTIST_ALIASES = {
+    "p nk": "pink",
+    "beyonce knowles": "beyonce",
+}
+
+
+def _split_featuring(text: str) -> list[str]:
+    # Split on 'Featuring' or 'ft.' (only if followed by something)
+    left, *right = FEAT_PATTERN.split(text, 1)
+    left, right = left.strip(), right[0].strip() if right else ''
+    return [p for p in (left, right) if p]
+
+def _drop_first_ampersand(text: str) -> list[str]:
+    # Multiple '&' means remove only the first one (band name case)
+    return [text.replace('&', '', 1).strip()]
+
+def _split_ampersand(text: str) -> list[str]:
+    # Single '&' means split into two artists
+    return [p.strip() for p in text.split('&') if p.strip()]
+
+# Checked in order for every credit segment; the first matching rule splits it
+SEGMENT_RULES = [
+    (lambda text: FEAT_PATTERN.search(text) is not None, _split_featuring),
+    (lambda text: text.count('&') > 1, _drop_first_ampersand),
+    (lambda text: text.count('&') == 1, _split_ampersand),
+]
+
+# ==============================================================================
+# 2. SPLITTING
+# ==============================================================================
+
+def split_artist_segment(text: str) -> list[str]:
+    for matches, split in SEGMENT_RULES:
+        if matches(text):
+            return split(text)
+    return [text]
+
+
+@lru_cache(maxsize=ARTIST_CACHE_SIZE)
+def split_artist_credit(raw_segments: tuple[str, ...]) -> tuple[str, ...]:
+    """
+    Splits the text segments of an artist credit (the strings between the artist links)
+    into individual artists. Memoized on the raw segments.
+    """
+    if len(raw_segments) <= 1:
+        if not ("Featuring" in raw_segments[0]):
+            return (raw_segments[0].strip(),)
+        else:
+            return tuple(s.strip() for s in raw_segments[0].split("Featuring"))
+
+    artistsList = []
+    for seg in raw_segments:
+        artistsList.extend(split_artist_segment(seg))
+
+    return tuple(a.replace(",", "").strip() for a in artistsList
+                 if a and a.strip() not in RESTRICTED_TOKENS)
+
+
+def split_artists(raw_segments: list[str]) -> list[str]:
+    return list(split_artist_credit(tuple(raw_segments)))
+
+# ==============================================================================
+# 3. CANONICAL ARTIST KEYS
+# ==============================================================================
+
+_punctuation = re.compile(r"[^\w\s]")
+_whitespace = re.compile(r"\s+")
+
+
+def fold_text(text: str) -> str:
+    """Lowercase text without accents, with punctuation turned into single spaces."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return _whitespace.sub(" ", _punctuation.sub(" ", text)).strip()
+
+
+@lru_cache(maxsize=ARTIST_CACHE_SIZE)
+def canonical_artist_key(name: str) -> str:
+    """
+    Collapses spelling variants of one artist to the same key: accents, case, '&' vs
+    'and', a leading 'The', punctuation and spacing are ignored, then ARTIST_ALIASES apply.
+    """
+    text = fold_text(name.replace("&", " and "))
+    if text.startswith("the "):
+        text = text[4:]
+    return ARTIST_ALIASES.get(text, text)
@@ -0,0 +1,217 @@
+"""
+Bulk historical backfill of the chart archive.
+
+    python -m util.backfill --start 1958-08-01 --end 2024-12-31 --workers 8 --rate 4
+    python -m util.backfill --chart billboard-200 --chart country-songs --start 2020-01-01
+    python -m util.backfill --reparse       # re-parse the raw page cache, no network
+
+Weeks already in the archive are skipped and every week is saved as soon as it is
+parsed, so an interrupted run resumes where it stopped when started again. Weeks are
+checked like the weekly updater checks them (util.chart_util.validate_chart); a week
+that fails is reported and not archived. Weeks whose raw page is cached (see
+util.fetch_util) are parsed from the cache instead of downloaded. With several charts
+(see util.chart_registry), all charts of a week are fetched together.
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+import requests
+
+from ChartData import ChartData
+from util.chart_registry import CHARTS, DEFAULT_CHART, get_chart_spec, get_week_label, resolve_chart_ids
+from util.chart_store import list_chart_dates, load_chart, save_chart
+from util.chart_parsers import parse_chart_html
+from util.chart_util import fetch_chart, get_page_cache_key, validate_chart
+from util.date_util import MIN_DATE, get_saturday_of_week, is_current_week
+from util.fetch_util import create_session, load_raw_page
+
+# ==============================================================================
+# 1. CONSTANTS
+# ==============================================================================
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 4.0          # requests per second across all workers
+
+# ==============================================================================
+# 2. HELPERS
+# ==============================================================================
+
+def get_chart_weeks(start: date, end: date) -> list[str]:
+    """Returns the Saturday of every chart week between start and end (inclusive), oldest first."""
+    first = date.fromisoformat(get_saturday_of_week(max(start, MIN_DATE)))
+    last = date.fromisoformat(get_saturday_of_week(end))
+
+    weeks = []
+    current = first
+    while current <= last:
+        weeks.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=7)
+    return weeks
+
+
+class RateLimiter:
+    """Spaces calls to acquire() at least 1 / rate seconds apart, shared across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+@dataclass
+class BackfillResult:
+    fetched: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+
+# ==============================================================================
+# 3. BACKFILL
+# ==============================================================================
+
+def _get_chart_weeks(start: date, end: date, chart_id: str) -> list[str]:
+    return get_chart_weeks(max(start, get_chart_spec(chart_id).first_date), end)
+
+
+def _check_chart(chart: ChartData, chart_id: str, chart_date: str) -> None:
+    problems = validate_chart(chart, chart_id, chart_date)
+    if problems:
+        raise ValueError(f"rejected: {'; '.join(problems)}")
+
+
+def _backfill_week(
+        chart_date: str, session: requests.Session, limiter: RateLimiter, base_url: str | None,
+        chart_id: str
+    ) -> int:
+    limiter.acquire()
+    chart = fetch_chart(chart_date, session, base_url, chart_id)
+    _check_chart(chart, chart_id, chart_date)
+    save_chart(chart_date, chart, chart_id)
+    return len(chart)
+
+
+def backfill(
+        start: date, end: date, workers: int = DEFAULT_WORKERS, rate: float = DEFAULT_RATE,
+        base_url: str | None = None, progress=None, chart_ids: list[str] | None = None
+    ) -> BackfillResult:
+    """
+    Fetches and archives every week between start and end of every chart in chart_ids
+    (default: the Hot 100) that is not archived yet. Weeks are fetched concurrently on a
+    bounded thread pool sharing one pooled session and a global rate limit. Results and
+    progress(done, total, label), if given, name weeks as in get_week_label.
+    """
+    result = BackfillResult()
+    pending = []
+    for chart_id in chart_ids or [DEFAULT_CHART]:
+        archived = set(list_chart_dates(chart_id))
+        for chart_date in _get_chart_weeks(start, end, chart_id):
+            if chart_date in archived and not is_current_week(chart_date):
+                result.skipped.append(get_week_label(chart_id, chart_date))
+            else:
+                pending.append((chart_date, chart_id))
+    # All charts of a week are queued next to each other, so they are fetched together
+    pending.sort()
+
+    session = create_session(workers)
+    limiter = RateLimiter(rate)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(_backfill_week, chart_date, session, limiter, base_url, chart_id):
+                get_week_label(chart_id, chart_date)
+            for chart_date, chart_id in pending
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            label = futures[future]
+            try:
+                future.result()
+                result.fetched.append(label)
+            except Exception as e:
+                result.failed[label] = str(e)
+            if progress:
+                progress(done, len(pending), label)
+    finally:
+        # On Ctrl+C, drop the queued weeks; everything finished so far is already archived
+        executor.shutdown(wait=True, cancel_futures=True)
+        session.close()
+
+    result.fetched.sort()
+    return result
+
+
+def reparse(
+        start: date, end: date, base_url: str | None = None, progress=None, chart_ids: list[str] | None = None
+    ) -> BackfillResult:
+    """
+    Re-parses every week between start and end of the given charts from the raw page
+    cache with the current parser and archives the ones that now parse differently
+    (reported as fetched). Weeks that are unchanged or not cached are skipped and weeks
+    that no longer validate fail; nothing is downloaded.
+    """
+    result = BackfillResult()
+    weeks = [
+        (chart_date, chart_id)
+        for chart_id in chart_ids or [DEFAULT_CHART] for chart_date in _get_chart_weeks(start, end, chart_id)
+    ]
+    for done, (chart_date, chart_id) in enumerate(weeks, 1):
+        label = get_week_label(chart_id, chart_date)
+        page = load_raw_page(get_page_cache_key(chart_date, base_url, chart_id))
+        try:
+            chart = parse_chart_html(page.body) if page is not None else None
+            if chart is not None:
+                _check_chart(chart, chart_id, chart_date)
+        except Exception as e:
+            result.failed[label] = str(e)
+        else:
+            if chart is None or chart == load_chart(chart_date, allow_stale=True, chart_id=chart_id):
+                result.skipped.append(label)
+            else:
+                save_chart(chart_date, chart, chart_id)
+                result.fetched.append(label)
+        if progress:
+            progress(done, len(weeks), label)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the chart archive for a date range.")
+    parser.add_argument("--start", type=date.fromisoformat, default=MIN_DATE)
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="max requests per second")
+    parser.add_argument("--base-url", default=None, help="charts URL prefix, e.g. a local fixture server")
+    parser.add_argument(
+        "--chart", action="append", choices=[*CHARTS, "all"], help="chart to backfill (repeatable, default hot-100)"
+    )
+    parser.add_argument("--reparse", action="store_true", help="re-parse cached raw pages instead of fetching")
+    args = parser.parse_args()
+    chart_ids = resolve_chart_ids(args.chart)
+
+    def print_progress(done, total, label):
+        print(f"[{done}/{total}] {label}", flush=True)
+
+    try:
+        if args.reparse:
+            result = reparse(args.start, args.end, args.base_url, print_progress, chart_ids)
+        else:
+            result = backfill(
+                args.start, args.end, args.workers, args.rate, args.base_url, print_progress, chart_ids
+            )
+    except KeyboardInterrupt:
+        print("Interrupted. Run the same command again to resume.")
+    else:
+        verb = "Re-parsed" if args.reparse else "Fetched"
+        print(f"{verb} {len(result.fetched)}, skipped {len(result.skipped)}, failed {len(result.failed)}")
+        for chart_date, error in sorted(result.failed.items()):
+            print(f"  {chart_date}: {error}")
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from util.perf_util import timed
+from util.song_index import make_song_key
+from util.viz_util import CHANGE_COLUMNS, add_change_columns
+
+# Bit flags set in the 'Categories' column by classify_chart
+PEAKER = 1
+GAINER = 2
+LOSER = 4
+RE_ENTRY = 8
+NEW_ENTRY = 16
+
+BIG_MOVE = 10
+DROPOUT_COLUMNS = ["Rank", "Title", "Artists", "Peak Position", "Total Weeks"]
+
+
+def get_song_keys(df: pd.DataFrame) -> pd.Series:
+    """(title, artist) identity of every row, see util.song_index.make_song_key."""
+    return pd.Series(
+        [make_song_key(t, a) for t, a in zip(df["Title"], df["Artists"])], index=df.index, dtype=object
+    )
+
+
+def classify_chart(df: pd.DataFrame) -> pd.Series:
+    """
+    Labels every row with all of its categories at once, as a bit mask of PEAKER,
+    GAINER, LOSER, RE_ENTRY and NEW_ENTRY.
+    """
+    df = add_change_columns(df)
+    category = df["Change Category"]
+    change = df["Change Int"].fillna(0).to_numpy()
+
+    # Peakers: at their peak, excluding songs that stayed put or just debuted
+    peaker = (df["Rank"] == df["Peak Position"]).to_numpy() & ~category.isin(["Same", "New"]).to_numpy()
+
+    flags = (
+        peaker * PEAKER
+        | (change >= BIG_MOVE) * GAINER
+        | (change <= -BIG_MOVE) * LOSER
+        | (category == "Return").to_numpy() * RE_ENTRY
+        | (category == "New").to_numpy() * NEW_ENTRY
+    )
+    return pd.Series(flags.astype(np.uint8), index=df.index, name="Categories")
+
+
+def get_top_artists(df: pd.DataFrame) -> pd.DataFrame:
+    """Artists with more than one song on the chart, by number of songs, best and median rank."""
+    artist_count = (
+        df.explode('Artists List')
+        .groupby('Artists List')
+        .agg(
+            No_Songs=('Rank', 'count'),
+            Best_Rank=('Rank', 'min'),           # Highest chart position
+            Median_Rank=('Rank', 'median'),
+        )
+        .reset_index()
+        .rename(columns={
+            'Artists List': 'Artist', 'No_Songs': 'No. Songs',
+            'Median_Rank': 'Median Rank', 'Best_Rank': 'Best Rank'
+        })
+        .sort_values(['No. Songs', 'Best Rank', 'Median Rank'],
+                   ascending=[False, True, True])
+    )
+    return artist_count[
+        (artist_count['No. Songs'] > 1) &
+        (artist_count['Artist'].str.len() > 1)
+    ]
+
+
+def get_dropouts(df: pd.DataFrame, df_last_week: pd.DataFrame) -> pd.DataFrame:
+    """Songs on last week's chart that are not on this week's, matched on (title, artist)."""
+    if df_last_week.empty:
+        return pd.DataFrame(columns=DROPOUT_COLUMNS)
+
+    dropped = ~get_song_keys(df_last_week).isin(set(get_song_keys(df)))
+    return df_last_week.loc[dropped, DROPOUT_COLUMNS].dropna(subset=['Rank'])
+
+
+@timed("table.sections")
+def build_chart_sections(df: pd.DataFrame, df_last_week: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Splits a chart into the Table Data page sections ('Chart' is the whole chart).
+    Rows are classified once; every section is then a mask over that single classification.
+    """
+    df = add_change_columns(df.copy())
+    df_norm = df.drop(columns=["Artists List", *CHANGE_COLUMNS])
+    categories = classify_chart(df).to_numpy()
+
+    def rows_with(flag: int) -> pd.DataFrame:
+        return df_norm[(categories & flag) != 0]
+
+    return {
+        "Chart": df_norm.dropna(subset=['Rank']),
+        "Peakers": rows_with(PEAKER).dropna(subset=['Rank', 'Peak Position']),
+        "Top Artists": get_top_artists(df),
+        "Gainers": rows_with(GAINER),
+        "Losers": rows_with(LOSER),
+        "Re-Entries": rows_with(RE_ENTRY).drop(columns=["Change", "Last Week"], errors='ignore'),
+        "New Entries": rows_with(NEW_ENTRY).drop(
+            columns=["Change", "Last Week", "Peak Position", "Total Weeks"], errors='ignore'
+        ),
+        "Dropouts": get_dropouts(df, df_last_week),
+    }
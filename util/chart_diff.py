@@ -0,0 +1,160 @@
+"""
+Week-over-week chart diffs keyed on song identity.
+
+Two weeks are joined on their song keys (see util.song_index.make_song_key) with a
+dict lookup per row, so a diff is O(n) and does not depend on the scraped 'Last Week'
+column. Any two weeks can be compared, and a whole range of archived weeks can be
+streamed as one diff per consecutive pair:
+
+    python -m util.chart_diff --start 1958-08-01 --end 2024-12-31 --output diffs.csv
+"""
+import argparse
+import csv
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import groupby
+
+import pandas as pd
+
+from ChartData import ChartData
+from util.chart_store import connect, get_archive_key
+from util.date_util import MIN_DATE
+from util.perf_util import timed
+from util.song_index import make_song_key, sync_song_index
+
+DIFF_COLUMNS = ["Status", "Title", "Artists", "Old Rank", "New Rank", "Change"]
+STREAM_COLUMNS = ["old_date", "new_date", "status", "song_key", "old_rank", "new_rank"]
+
+# ==============================================================================
+# 1. DIFF
+# ==============================================================================
+
+@dataclass
+class ChartDiff:
+    old_date: str
+    new_date: str
+    entries: list[tuple[str, int]] = field(default_factory=list)        # (song_key, new rank)
+    exits: list[tuple[str, int]] = field(default_factory=list)          # (song_key, old rank)
+    moves: list[tuple[str, int, int]] = field(default_factory=list)     # (song_key, old rank, new rank)
+    unchanged: list[tuple[str, int]] = field(default_factory=list)      # (song_key, rank)
+
+    def iter_rows(self):
+        """(status, song_key, old_rank, new_rank) for every song on either chart; missing ranks are None."""
+        for key, rank in self.entries:
+            yield "Entry", key, None, rank
+        for key, rank in self.exits:
+            yield "Exit", key, rank, None
+        for key, old_rank, new_rank in self.moves:
+            yield ("Up" if new_rank < old_rank else "Down"), key, old_rank, new_rank
+        for key, rank in self.unchanged:
+            yield "Same", key, rank, rank
+
+
+def diff_ranks(old: dict[str, int], new: dict[str, int], old_date: str = "", new_date: str = "") -> ChartDiff:
+    """Diffs two {song_key: rank} maps with one hash lookup per song."""
+    diff = ChartDiff(old_date, new_date)
+    for key, rank in new.items():
+        old_rank = old.get(key)
+        if old_rank is None:
+            diff.entries.append((key, rank))
+        elif old_rank == rank:
+            diff.unchanged.append((key, rank))
+        else:
+            diff.moves.append((key, old_rank, rank))
+    diff.exits = [(key, rank) for key, rank in old.items() if key not in new]
+    return diff
+
+
+def get_rank_map(chart: ChartData) -> dict[str, int]:
+    return {make_song_key(t, a): rank for rank, t, a in zip(chart.ranks, chart.titles, chart.artists)}
+
+
+def diff_charts(old: ChartData, new: ChartData, old_date: str = "", new_date: str = "") -> ChartDiff:
+    """Diffs two charts that are already in memory, e.g. freshly fetched ones."""
+    return diff_ranks(get_rank_map(old), get_rank_map(new), old_date, new_date)
+
+# ==============================================================================
+# 2. ARCHIVED WEEKS
+# ==============================================================================
+
+def _load_rank_map(conn, chart_date: str) -> dict[str, int]:
+    return dict(conn.execute("SELECT song_key, rank FROM song_weeks WHERE chart_date = ?", (chart_date,)))
+
+
+@timed("diff.weeks")
+def diff_weeks(old_str: str | date, new_str: str | date) -> pd.DataFrame:
+    """
+    Compares any two archived weeks, e.g. a week with the same week a year earlier.
+    Returns one row per song on either chart with columns DIFF_COLUMNS: 'Status' is
+    Entry, Exit, Up, Down or Same and 'Change' is the number of spots moved up.
+    """
+    sync_song_index()
+    old_date, new_date = get_archive_key(old_str), get_archive_key(new_str)
+    with connect() as conn:
+        diff = diff_ranks(_load_rank_map(conn, old_date), _load_rank_map(conn, new_date), old_date, new_date)
+        rows = pd.DataFrame(list(diff.iter_rows()), columns=["Status", "song_key", "Old Rank", "New Rank"])
+        songs = pd.read_sql_query(
+            f"SELECT song_key, title AS Title, artists AS Artists FROM songs "
+            f"WHERE song_key IN ({','.join('?' * len(rows))})",
+            conn, params=list(rows["song_key"])
+        ) if len(rows) else pd.DataFrame(columns=["song_key", "Title", "Artists"])
+
+    diffs = rows.merge(songs, on="song_key", how="left")
+    diffs["Old Rank"] = diffs["Old Rank"].astype("Int16")
+    diffs["New Rank"] = diffs["New Rank"].astype("Int16")
+    diffs["Change"] = diffs["Old Rank"] - diffs["New Rank"]
+    return diffs.sort_values(["New Rank", "Old Rank"], na_position="last")[DIFF_COLUMNS].reset_index(drop=True)
+
+
+def iter_week_diffs(start: str, end: str):
+    """
+    Yields a ChartDiff for every pair of consecutive archived weeks from start to end
+    (inclusive 'YYYY-MM-DD'), oldest first. The range is read in one ordered pass over
+    the song index and each week's key map is reused as the next pair's old side.
+    """
+    sync_song_index()
+    with connect() as conn:
+        cursor = conn.execute(
+            "SELECT chart_date, song_key, rank FROM song_weeks "
+            "WHERE chart_date BETWEEN ? AND ? ORDER BY chart_date",
+            (start, end)
+        )
+        previous_date, previous = None, None
+        for chart_date, rows in groupby(cursor, key=lambda row: row[0]):
+            ranks = {song_key: rank for _, song_key, rank in rows}
+            if previous is not None:
+                yield diff_ranks(previous, ranks, previous_date, chart_date)
+            previous_date, previous = chart_date, ranks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream week-over-week diffs of the chart archive.")
+    parser.add_argument("--start", default=MIN_DATE.strftime("%Y-%m-%d"))
+    parser.add_argument("--end", default=date.today().strftime("%Y-%m-%d"))
+    parser.add_argument("--output", help="CSV file to write the diff rows to (default: summary only)")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", newline="") if args.output else None
+    writer = csv.writer(out) if out else None
+    if writer:
+        writer.writerow(STREAM_COLUMNS)
+
+    started = time.perf_counter()
+    pairs = entries = exits = moves = 0
+    try:
+        for diff in iter_week_diffs(args.start, args.end):
+            pairs += 1
+            entries += len(diff.entries)
+            exits += len(diff.exits)
+            moves += len(diff.moves)
+            if writer:
+                writer.writerows((diff.old_date, diff.new_date, *row) for row in diff.iter_rows())
+    finally:
+        if out:
+            out.close()
+
+    print(
+        f"{pairs} week pairs diffed in {time.perf_counter() - started:.2f} s: "
+        f"{entries} entries, {exits} exits, {moves} moves"
+    )
@@ -0,0 +1,66 @@
+"""
+The Billboard charts the app can fetch, archive and analyze.
+
+Every chart on billboard.com is served at <charts URL>/<slug>/<YYYY-MM-DD> with the
+same row markup, so one parser handles them all; a chart only differs in its slug,
+its number of rows and the first week it was published. Several charts had a different
+number of positions in earlier eras (the Billboard 200 started with 150, the R&B/hip-hop
+chart had 100 until 2012), so a week is held to the current size only from sized_since
+on. Archive rows, raw pages and fetch leases are keyed on (slug, chart week).
+"""
+from dataclasses import dataclass
+from datetime import date
+
+from util.date_util import MIN_DATE
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    slug: str
+    name: str
+    size: int               # rows in a complete week
+    first_date: date        # first chart week published
+    kind: str = "songs"     # what the rows are: songs or albums
+    sized_since: date | None = None     # first week with size rows; first_date if None
+
+    def get_size(self, chart_date: str) -> int | None:
+        """Rows a complete chart_date week has, or None for an era whose size is not fixed."""
+        if chart_date >= (self.sized_since or self.first_date).strftime("%Y-%m-%d"):
+            return self.size
+        return None
+
+
+CHARTS: dict[str, ChartSpec] = {spec.slug: spec for spec in [
+    ChartSpec("hot-100", "Billboard Hot 100", 100, MIN_DATE),
+    ChartSpec("billboard-200", "Billboard 200", 200, date(1963, 8, 17), "albums", sized_since=date(1967, 5, 13)),
+    ChartSpec("billboard-global-200", "Billboard Global 200", 200, date(2020, 9, 19)),
+    ChartSpec("country-songs", "Hot Country Songs", 50, date(1958, 10, 25), sized_since=date(2012, 10, 20)),
+    ChartSpec("r-b-hip-hop-songs", "Hot R&B/Hip-Hop Songs", 50, date(1958, 10, 25), sized_since=date(2012, 10, 20)),
+    ChartSpec("rock-songs", "Hot Rock & Alternative Songs", 50, date(2009, 6, 20), sized_since=date(2012, 10, 20)),
+    ChartSpec("latin-songs", "Hot Latin Songs", 50, date(1986, 9, 20), sized_since=date(2012, 10, 20)),
+    ChartSpec("dance-electronic-songs", "Hot Dance/Electronic Songs", 50, date(2013, 1, 26)),
+]}
+
+# The chart the song, artist, year-end and search indexes and the history store are built from
+DEFAULT_CHART = "hot-100"
+
+
+def get_chart_spec(chart_id: str) -> ChartSpec:
+    try:
+        return CHARTS[chart_id]
+    except KeyError:
+        raise KeyError(f"Unknown chart '{chart_id}'. Known charts: {', '.join(CHARTS)}") from None
+
+
+def get_week_label(chart_id: str, chart_date: str) -> str:
+    """How a chart week is named in job output: the bare date for the default chart, else slug/date."""
+    return chart_date if chart_id == DEFAULT_CHART else f"{chart_id}/{chart_date}"
+
+
+def resolve_chart_ids(chart_ids: list[str] | None) -> list[str]:
+    """Chart slugs from a command line: the default chart if none are given, every chart for 'all'."""
+    if not chart_ids:
+        return [DEFAULT_CHART]
+    if "all" in chart_ids:
+        return list(CHARTS)
+    return [get_chart_spec(chart_id).slug for chart_id in dict.fromkeys(chart_ids)]
@@ -0,0 +1,289 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from ChartData import ChartData
+from util.chart_registry import DEFAULT_CHART
+from util.date_util import get_saturday_of_week, is_current_week, to_date
+from util.perf_util import count, timed
+
+# ==============================================================================
+# 1. CONSTANTS
+# ==============================================================================
+
+ARCHIVE_PATH = os.environ.get(
+    "BILLBOARD_ARCHIVE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "charts.sqlite3")
+)
+
+# Past weeks never change, so only the current week is re-fetched after this many seconds
+CURRENT_WEEK_TTL = 600
+
+# Optional size cap (MB of stored chart data); least recently used weeks are evicted beyond it
+MAX_ARCHIVE_MB = float(os.environ.get("BILLBOARD_ARCHIVE_MAX_MB", "0")) or None
+ACCESS_UPDATE_INTERVAL = 60
+
+# How long one process may hold the right to fetch a week before others take over
+FETCH_LEASE_SECONDS = 60
+
+# Every chart week is keyed on the chart's slug (see util.chart_registry) and its Saturday
+CHARTS_TABLE = """
+CREATE TABLE IF NOT EXISTS {name} (
+    chart TEXT NOT NULL,
+    chart_date TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    entries TEXT NOT NULL,
+    accessed_at REAL NOT NULL DEFAULT 0,
+    checked_at REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (chart, chart_date)
+);
+"""
+FETCH_LEASES_TABLE = """
+CREATE TABLE IF NOT EXISTS fetch_leases (
+    chart TEXT NOT NULL,
+    chart_date TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (chart, chart_date)
+);
+"""
+SCHEMA = CHARTS_TABLE.format(name="charts") + FETCH_LEASES_TABLE
+
+_schema_lock = threading.Lock()
+_schema_ready: set[str] = set()
+
+# ==============================================================================
+# 2. CONNECTION
+# ==============================================================================
+
+@contextmanager
+def connect(path: str | None = None):
+    """
+    Opens a connection to the chart archive, creating the file and schema on first use.
+    Commits on success and always closes the connection.
+    """
+    path = path or ARCHIVE_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        with _schema_lock:
+            if path not in _schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                _migrate(conn)
+                _schema_ready.add(path)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(charts)")]
+    if "accessed_at" not in columns:
+        conn.execute("ALTER TABLE charts ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+    if "checked_at" not in columns:
+        conn.execute("ALTER TABLE charts ADD COLUMN checked_at REAL NOT NULL DEFAULT 0")
+    conn.commit()
+
+    if "chart" not in columns:
+        # Archives from before other charts were supported only hold Hot 100 weeks keyed on
+        # the date alone. SQLite can't change a primary key, so the table is copied over.
+        # Derived indexes stay valid: their weeks keep the same dates and fetch times.
+        conn.execute("BEGIN IMMEDIATE")
+        if "chart" not in [row[1] for row in conn.execute("PRAGMA table_info(charts)")]:
+            conn.execute(CHARTS_TABLE.format(name="charts_migrated"))
+            conn.execute("""
+                INSERT INTO charts_migrated (chart, chart_date, fetched_at, entries, accessed_at, checked_at)
+                SELECT ?, chart_date, fetched_at, entries, accessed_at, checked_at FROM charts
+            """, (DEFAULT_CHART,))
+            conn.execute("DROP TABLE charts")
+            conn.execute("ALTER TABLE charts_migrated RENAME TO charts")
+            # Leases only live for a minute, so the old ones are simply dropped
+            conn.execute("DROP TABLE fetch_leases")
+            conn.execute(FETCH_LEASES_TABLE)
+        conn.commit()
+
+# ==============================================================================
+# 3. ARCHIVE ACCESS
+# ==============================================================================
+
+def get_archive_key(chart_str: str | date) -> str:
+    """Every date of a chart week is stored under the Saturday of that week."""
+    return get_saturday_of_week(to_date(chart_str))
+
+
+@timed("archive.load")
+def load_chart(
+        chart_str: str | date, allow_stale: bool = False, chart_id: str = DEFAULT_CHART
+    ) -> ChartData | None:
+    """
+    Returns the archived chart_id chart for the week of chart_str, or None if the week
+    has not been archived yet or is the current week and was last fetched or checked
+    more than CURRENT_WEEK_TTL ago (unless allow_stale is set).
+    """
+    key = get_archive_key(chart_str)
+    with connect() as conn:
+        row = conn.execute(
+            "SELECT MAX(fetched_at, checked_at), accessed_at, entries FROM charts WHERE chart = ? AND chart_date = ?",
+            (chart_id, key)
+        ).fetchone()
+
+        if row is not None and MAX_ARCHIVE_MB and time.time() - row[1] > ACCESS_UPDATE_INTERVAL:
+            # Recency for LRU eviction, written at most once a minute per week
+            conn.execute(
+                "UPDATE charts SET accessed_at = ? WHERE chart = ? AND chart_date = ?", (time.time(), chart_id, key)
+            )
+
+    if row is None:
+        count("archive.miss")
+        return None
+
+    checked_at, _, entries = row
+    if not allow_stale and is_current_week(key) and time.time() - checked_at > CURRENT_WEEK_TTL:
+        count("archive.stale")
+        return None
+
+    count("archive.hit")
+    return decode_entries(entries)
+
+
+def decode_entries(entries: str) -> ChartData:
+    """Decodes a stored chart: a dict of columns, or a list of row dicts from older archives."""
+    data = json.loads(entries)
+    return ChartData.from_records(data) if isinstance(data, list) else ChartData.from_dict(data)
+
+
+@timed("archive.save")
+def save_chart(chart_str: str | date, chart: ChartData, chart_id: str = DEFAULT_CHART) -> None:
+    """Stores (or replaces) the chart_id chart for the week of chart_str. Empty charts are not stored."""
+    if not len(chart):
+        return
+
+    now = time.time()
+    with connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO charts (chart, chart_date, fetched_at, accessed_at, entries) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (chart_id, get_archive_key(chart_str), now, now, json.dumps(chart.to_dict()))
+        )
+        if MAX_ARCHIVE_MB:
+            evict_to_size(conn, int(MAX_ARCHIVE_MB * 1024 * 1024))
+
+
+def mark_checked(chart_str: str | date, chart_id: str = DEFAULT_CHART) -> None:
+    """
+    Records that the archived week was just confirmed unchanged at the source. It counts
+    as fresh again without a new fetched_at, so the indexes have nothing to redo.
+    """
+    with connect() as conn:
+        conn.execute(
+            "UPDATE charts SET checked_at = ? WHERE chart = ? AND chart_date = ?",
+            (time.time(), chart_id, get_archive_key(chart_str))
+        )
+
+
+def evict_to_size(conn: sqlite3.Connection, max_bytes: int) -> int:
+    """Deletes the least recently used weeks of any chart until the stored chart data fits in max_bytes."""
+    total = conn.execute("SELECT COALESCE(SUM(LENGTH(entries)), 0) FROM charts").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+
+    evicted = []
+    for chart_id, chart_date, size in conn.execute(
+            "SELECT chart, chart_date, LENGTH(entries) FROM charts ORDER BY accessed_at, chart_date").fetchall():
+        if total <= max_bytes:
+            break
+        evicted.append((chart_id, chart_date))
+        total -= size
+
+    conn.executemany("DELETE FROM charts WHERE chart = ? AND chart_date = ?", evicted)
+    count("archive.evicted", len(evicted))
+    return len(evicted)
+
+
+def iter_unindexed_charts(conn: sqlite3.Connection, index_table: str, chart_id: str = DEFAULT_CHART):
+    """
+    Yields (chart_date, fetched_at, ChartData) for every archived chart_id week that
+    index_table has not seen yet, or that was re-fetched after it was indexed. index_table
+    must have the columns (chart_date TEXT PRIMARY KEY, fetched_at REAL); see mark_indexed.
+    """
+    rows = conn.execute(f"""
+        SELECT c.chart_date, c.fetched_at, c.entries
+        FROM charts c LEFT JOIN {index_table} i ON i.chart_date = c.chart_date
+        WHERE c.chart = ? AND (i.chart_date IS NULL OR i.fetched_at < c.fetched_at)
+        ORDER BY c.chart_date
+    """, (chart_id,)).fetchall()
+    for chart_date, fetched_at, entries in rows:
+        yield chart_date, fetched_at, decode_entries(entries)
+
+
+def mark_indexed(conn: sqlite3.Connection, index_table: str, chart_date: str, fetched_at: float) -> None:
+    conn.execute(
+        f"INSERT OR REPLACE INTO {index_table} (chart_date, fetched_at) VALUES (?, ?)",
+        (chart_date, fetched_at)
+    )
+
+
+def iter_charts(start: str, end: str, chart_id: str = DEFAULT_CHART):
+    """
+    Yields (chart_date, ChartData) for every archived chart_id week from start to end
+    (inclusive), oldest first. Weeks are decoded one at a time, so a long range is never
+    held in memory.
+    """
+    with connect() as conn:
+        cursor = conn.execute(
+            "SELECT chart_date, entries FROM charts WHERE chart = ? AND chart_date BETWEEN ? AND ? "
+            "ORDER BY chart_date",
+            (chart_id, start, end)
+        )
+        for chart_date, entries in cursor:
+            yield chart_date, decode_entries(entries)
+
+
+def list_chart_dates(chart_id: str = DEFAULT_CHART) -> list[str]:
+    """Returns all archived chart dates of chart_id in ascending order."""
+    with connect() as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT chart_date FROM charts WHERE chart = ? ORDER BY chart_date", (chart_id,)
+        )]
+
+# ==============================================================================
+# 4. FETCH COORDINATION
+# ==============================================================================
+
+def acquire_fetch_lease(chart_str: str | date, owner: str, chart_id: str = DEFAULT_CHART) -> bool:
+    """
+    Claims the right to fetch a chart week across every process sharing the archive.
+    Returns False while another owner holds an unexpired lease for the same week.
+    """
+    now = time.time()
+    with connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute("""
+            INSERT INTO fetch_leases (chart, chart_date, owner, expires_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (chart, chart_date) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE fetch_leases.expires_at < ?
+        """, (chart_id, get_archive_key(chart_str), owner, now + FETCH_LEASE_SECONDS, now))
+        return cursor.rowcount == 1
+
+
+def release_fetch_lease(chart_str: str | date, owner: str, chart_id: str = DEFAULT_CHART) -> None:
+    with connect() as conn:
+        conn.execute(
+            "DELETE FROM fetch_leases WHERE chart = ? AND chart_date = ? AND owner = ?",
+            (chart_id, get_archive_key(chart_str), owner)
+        )
+
+
+def is_fetch_leased(chart_str: str | date, chart_id: str = DEFAULT_CHART) -> bool:
+    with connect() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM fetch_leases WHERE chart = ? AND chart_date = ? AND expires_at >= ?",
+            (chart_id, get_archive_key(chart_str), time.time())
+        ).fetchone()
+    return row is not None
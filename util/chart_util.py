@@ -1,84 +1,227 @@
-import re
-from typing import List
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING
 from ChartData import ChartData
-from bs4 import BeautifulSoup
-from bs4.element import ResultSet
-import requests
-
-def get_artistsList(artistsSpan) -> list[str]:
-    raw_segments: list[str] = [t.strip() for t in artistsSpan.stripped_strings if t.strip()]
-    
-    if len(raw_segments) <= 1:
-        if not ("Featuring" in raw_segments[0]):
-            return [raw_segments[0].strip()]
-        else:
-            return [s.strip() for s in raw_segments[0].split("Featuring")]
-    
-    def split_artist_segment(text) -> list[str]:
-        parts = []
-        
-        # Split on 'Featuring' or 'ft.' (only if followed by something)
-        feat_pattern = re.compile(r'\b(?:featuring|ft\.)\b', re.IGNORECASE)
-        if feat_pattern.search(text):
-            left, *right = feat_pattern.split(text, 1)
-            left, right = left.strip(), right[0].strip() if right else ''
-            if left:
-                parts.append(left)
-            if right:
-                parts.append(right)
-            return parts
-        
-        # Handle '&' logic
-        amp_count = text.count('&')
-        if amp_count > 1:
-            # Multiple '&' means remove only the first one (band name case)
-            text = text.replace('&', '', 1).strip()
-            return [text]
-        elif amp_count == 1:
-            # Single '&' means split into two artists
-            subparts = [p.strip() for p in text.split('&') if p.strip()]
-            parts.extend(subparts)
-            return parts
-        
-        return [text]
-
-    # Step 3: apply the splitting to each segment
-    artistsList = []
-    for seg in raw_segments:
-        artistsList.extend(split_artist_segment(seg))
-    
-    restrictedList = ["With", "X", "x", ",", "&"]
-        
-    artistsList: list[str] = [a.replace(",", "").strip() for a in artistsList 
-                              if a and a.strip() not in restrictedList]
-    
-    return artistsList
-
-def __get_chart_info(rank: int, chart_result: ResultSet) -> ChartData:
-    title = chart_result.find("h3", id="title-of-a-story").text.strip()
-    
-    artistsSpan = chart_result.find("span", class_="a-no-trucate")
-    artistsText = artistsSpan.text.strip().replace("Featuring", "ft.")
-    artistsList = get_artistsList(artistsSpan)
-
-    song_stats = chart_result.find_all("span", class_="u-font-size-12")
-
-    last_week = song_stats[1].text.strip()
-    last_week = int(last_week) if last_week.isdigit() else None
-
-    peak_pos = int(song_stats[3].text.strip())
-    total_weeks = int(song_stats[5].text.strip())
-
-    return ChartData(rank, title, artistsText, artistsList, last_week, peak_pos, total_weeks)
-
-def get_chart_data(chart_str: str) -> List[dict[str, any]]:
-    SITE_URL: str = f'https://www.billboard.com/charts/hot-100/{chart_str}'
-    response = requests.get(SITE_URL)
-    soup = BeautifulSoup(response.content, 'html.parser')
-
-    chart_results: ResultSet = soup.find_all('div', class_='o-chart-results-list-row-container')
-    chart_entries = [
-        __get_chart_info(rank, chart_result).get_dict()
-        for rank, chart_result in enumerate(chart_results, 1)
+from util.chart_registry import DEFAULT_CHART, get_chart_spec
+from util.chart_store import (
+    FETCH_LEASE_SECONDS,
+    acquire_fetch_lease,
+    get_archive_key,
+    is_fetch_leased,
+    load_chart,
+    mark_checked,
+    release_fetch_lease,
+    save_chart
+)
+from util.date_util import is_current_week
+from util.perf_util import count
+
+# The scraping stack (requests, util.fetch_util and the parser backends) is imported on
+# the first real cache miss, so pages that only read archived weeks never load it
+if TYPE_CHECKING:
+    import requests
+
+# Every chart's weekly pages live under <BASE_URL>/<chart slug>/<YYYY-MM-DD>
+BASE_URL: str = os.environ.get("BILLBOARD_BASE_URL", "https://www.billboard.com/charts")
+
+# Archive-only mode: the archive is kept current by `python -m util.updater` and user
+# requests never touch the network
+OFFLINE = os.environ.get("BILLBOARD_OFFLINE") == "1"
+
+# Shared by every session of the app; fetches are I/O bound so a few threads suffice
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chart-fetch")
+
+# Speculative prefetches get their own small pool, so a user's fetch never queues behind
+# them, and weeks beyond MAX_PENDING_PREFETCHES waiting ones are not prefetched at all
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chart-prefetch")
+MAX_PENDING_PREFETCHES = 8
+_prefetching: set[tuple[str, str]] = set()
+_prefetch_lock = threading.Lock()
+
+# Chart weeks being fetched by this process: later callers wait on the same Future
+_inflight: dict[tuple[str, str], Future] = {}
+_inflight_lock = threading.Lock()
+LEASE_POLL_SECONDS = 0.25
+
+def get_chart_url(chart_id: str = DEFAULT_CHART, base_url: str | None = None) -> str:
+    """URL prefix of a chart's weekly pages, e.g. https://www.billboard.com/charts/hot-100."""
+    # Older settings pointed at the Hot 100 pages themselves
+    charts_url = (base_url or BASE_URL).rstrip("/").removesuffix(f"/{DEFAULT_CHART}")
+    return f"{charts_url}/{chart_id}"
+
+def get_page_cache_key(chart_str: str, base_url: str | None = None, chart_id: str = DEFAULT_CHART) -> str:
+    """
+    Raw page cache key of a chart week. Every URL date of the week shares it, so the
+    current week fetched under today's date is revalidated against the previous download.
+    """
+    return f"{get_chart_url(chart_id, base_url)}/{get_archive_key(chart_str)}"
+
+def fetch_chart_html(
+        chart_str: str, session: "requests.Session | None" = None, base_url: str | None = None,
+        chart_id: str = DEFAULT_CHART
+    ) -> bytes:
+    """
+    Raw chart page for chart_str (see util.fetch_util). A past week downloaded before is
+    read from the raw page cache; the current week is revalidated with a conditional request.
+    """
+    from util.fetch_util import fetch_page
+
+    SITE_URL: str = f'{get_chart_url(chart_id, base_url)}/{chart_str}'
+    return fetch_page(
+        SITE_URL, get_page_cache_key(chart_str, base_url, chart_id), session,
+        revalidate=is_current_week(chart_str)
+    )
+
+def fetch_chart(
+        chart_str: str, session: "requests.Session | None" = None, base_url: str | None = None,
+        chart_id: str = DEFAULT_CHART
+    ) -> ChartData:
+    """Fetches and parses the chart for chart_str. Raises ValueError if the page has no chart rows."""
+    from util.chart_parsers import parse_chart_html
+    from util.fetch_util import forget_raw_page
+
+    chart = parse_chart_html(fetch_chart_html(chart_str, session, base_url, chart_id))
+    if not len(chart):
+        # An error or placeholder page served with a 200: don't keep it in the raw cache
+        forget_raw_page(get_page_cache_key(chart_str, base_url, chart_id))
+        raise ValueError("page contained no chart rows")
+    return chart
+
+def validate_chart(chart: ChartData, chart_id: str = DEFAULT_CHART, chart_date: str | None = None) -> list[str]:
+    """
+    Problems that keep a fetched week out of the archive (util.updater and util.backfill);
+    an empty list means it is valid. A chart_date from an era when the chart had a
+    different size (see ChartSpec.sized_since) only needs some contiguous ranking 1..n.
+    """
+    spec = get_chart_spec(chart_id)
+    expected_rows = spec.get_size(chart_date) if chart_date else spec.size
+    if expected_rows is not None and len(chart) != expected_rows:
+        return [f"expected {expected_rows} rows, found {len(chart)}"]
+
+    problems = []
+    if list(chart.ranks) != list(range(1, len(chart) + 1)):
+        problems.append(f"ranks are not 1 to {len(chart)} in order")
+    if not all(title.strip() and artists.strip() for title, artists in zip(chart.titles, chart.artists)):
+        problems.append("some rows have no title or artists")
+    if len(set(zip(chart.titles, chart.artists))) != len(chart):
+        problems.append("the same song appears more than once")
+    if any(not 1 <= peak <= rank for peak, rank in zip(chart.peak_positions, chart.ranks)):
+        problems.append("some peak positions are below the current rank")
+    if any(weeks < 1 for weeks in chart.total_weeks):
+        problems.append("some songs have no weeks on chart")
+    return problems
+
+def _fetch_and_archive(chart_str: str, session: "requests.Session | None", chart_id: str) -> ChartData:
+    """
+    Fetches and archives a chart week unless another process sharing the archive is
+    already doing so, in which case its result is read from the archive once it lands.
+    """
+    owner = uuid.uuid4().hex
+    while True:
+        if acquire_fetch_lease(chart_str, owner, chart_id):
+            try:
+                chart = fetch_chart(chart_str, session, chart_id=chart_id)
+                if chart == load_chart(chart_str, allow_stale=True, chart_id=chart_id):
+                    # A stale current week that has not changed (often a 304): keep the
+                    # stored copy so the indexes have nothing to redo
+                    mark_checked(chart_str, chart_id)
+                else:
+                    save_chart(chart_str, chart, chart_id)
+                return chart
+            finally:
+                release_fetch_lease(chart_str, owner, chart_id)
+
+        count("fetch.coalesced.remote")
+        deadline = time.monotonic() + FETCH_LEASE_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(LEASE_POLL_SECONDS)
+            archived = load_chart(chart_str, chart_id=chart_id)
+            if archived is not None:
+                return archived
+            if not is_fetch_leased(chart_str, chart_id):
+                break  # The other fetch failed or its lease expired: try to take over
+
+def get_chart_data(
+        chart_str: str, session: "requests.Session | None" = None, chart_id: str = DEFAULT_CHART
+    ) -> ChartData:
+    archived = load_chart(chart_str, allow_stale=OFFLINE, chart_id=chart_id)
+    if archived is not None:
+        return archived
+    if OFFLINE:
+        name = get_chart_spec(chart_id).name
+        raise LookupError(f"The {name} week of {get_archive_key(chart_str)} is not in the chart archive yet.")
+
+    # Single flight: concurrent requests for the same chart week share one fetch and parse
+    key = (chart_id, get_archive_key(chart_str))
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = _inflight[key] = Future()
+
+    if not is_leader:
+        count("fetch.coalesced.local")
+        return future.result()
+
+    try:
+        chart = _fetch_and_archive(chart_str, session, chart_id)
+        future.set_result(chart)
+        return chart
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def fetch_charts_concurrently(chart_strs: list[str], chart_ids: list[str] | None = None) -> None:
+    """
+    Fetches every date of every chart (the default chart if none are given) into the
+    archive at the same time and waits for all of them, so loading several chart weeks
+    costs one network round trip instead of several. Failures are ignored here and
+    reported by the caller's own get_chart_data call.
+    """
+    if OFFLINE:
+        return
+    futures = [
+        _executor.submit(get_chart_data, chart_str, None, chart_id)
+        for chart_id in chart_ids or [DEFAULT_CHART] for chart_str in chart_strs
     ]
-    return chart_entries
\ No newline at end of file
+    for future in futures:
+        future.exception()
+
+def get_week_charts(chart_str: str, chart_ids: list[str]) -> dict[str, ChartData | Exception]:
+    """
+    The week of chart_str on every chart in chart_ids, fetched concurrently. Charts that
+    could not be loaded map to their exception instead of failing the others.
+    """
+    futures = {chart_id: _executor.submit(get_chart_data, chart_str, None, chart_id) for chart_id in chart_ids}
+    return {chart_id: future.exception() or future.result() for chart_id, future in futures.items()}
+
+def _prefetch(key: str, chart_id: str) -> None:
+    try:
+        get_chart_data(key, chart_id=chart_id)
+    except Exception:
+        pass  # Speculative only: a failed prefetch is retried when the week is really requested
+    finally:
+        with _prefetch_lock:
+            _prefetching.discard((chart_id, key))
+
+def prefetch_charts(chart_strs: list[str], chart_id: str = DEFAULT_CHART) -> None:
+    """Fetches the given weeks of chart_id into the archive in the background without waiting for them."""
+    if OFFLINE:
+        return
+    for chart_str in chart_strs:
+        key = get_archive_key(chart_str)
+        with _prefetch_lock:
+            if (chart_id, key) in _prefetching:
+                continue
+            if len(_prefetching) >= MAX_PENDING_PREFETCHES:
+                count("fetch.prefetch.dropped")
+                return
+            _prefetching.add((chart_id, key))
+        _prefetch_executor.submit(_prefetch, key, chart_id)
@@ -0,0 +1,80 @@
+"""
+One week across several charts.
+
+Songs are matched on song identity (see util.song_index.make_song_key) and artists on
+their canonical keys (see util.artist_util.canonical_artist_key), so a Hot 100 hit is
+lined up with its rank on the genre charts and an artist's entries are counted on
+every chart at once. The charts of a week are fetched concurrently.
+"""
+import pandas as pd
+
+from ChartData import ChartData
+from util.artist_util import canonical_artist_key
+from util.chart_registry import get_chart_spec
+from util.chart_util import get_week_charts
+from util.perf_util import timed
+from util.song_index import make_song_key
+
+
+def _sort_by_reach(frame: pd.DataFrame, rank_columns: list[str]) -> pd.DataFrame:
+    # Most charts first, then the best rank on any of them
+    order = frame.assign(_best=frame[rank_columns].min(axis=1)).sort_values(
+        ["Charts", "_best"], ascending=[False, True], kind="stable"
+    )
+    return order.drop(columns="_best").reset_index(drop=True)
+
+
+@timed("cross_chart.songs")
+def get_cross_chart_songs(charts: dict[str, ChartData]) -> pd.DataFrame:
+    """
+    One row per song on any of charts: Title, Artists, its rank on every chart (one
+    column per chart name, <NA> when absent) and Charts, the number of charts it is on.
+    """
+    names = [get_chart_spec(chart_id).name for chart_id in charts]
+    songs: dict[str, dict] = {}
+    for name, chart in zip(names, charts.values()):
+        for rank, title, artists in zip(chart.ranks, chart.titles, chart.artists):
+            song = songs.setdefault(make_song_key(title, artists), {"Title": title, "Artists": artists})
+            song[name] = rank
+
+    frame = pd.DataFrame(list(songs.values()), columns=["Title", "Artists", *names])
+    frame[names] = frame[names].astype("Int16")
+    frame["Charts"] = frame[names].notna().sum(axis=1)
+    return _sort_by_reach(frame, names)
+
+
+@timed("cross_chart.artists")
+def get_cross_chart_artists(charts: dict[str, ChartData]) -> pd.DataFrame:
+    """
+    One row per credited artist on any of charts: Artist, their best rank on every chart
+    (one column per chart name, <NA> when absent), Entries across all charts and Charts,
+    the number of charts they are on.
+    """
+    names = [get_chart_spec(chart_id).name for chart_id in charts]
+    artists: dict[str, dict] = {}
+    for name, chart in zip(names, charts.values()):
+        for rank, artists_list in zip(chart.ranks, chart.artists_lists):
+            for artist in artists_list:
+                row = artists.setdefault(canonical_artist_key(artist), {"Artist": artist, "Entries": 0})
+                row[name] = min(row.get(name, rank), rank)
+                row["Entries"] += 1
+
+    frame = pd.DataFrame(list(artists.values()), columns=["Artist", *names, "Entries"])
+    frame[names] = frame[names].astype("Int16")
+    frame["Charts"] = frame[names].notna().sum(axis=1)
+    return _sort_by_reach(frame, names)
+
+
+def compare_charts(chart_str: str, chart_ids: list[str]) -> tuple[dict[str, pd.DataFrame], dict[str, str]]:
+    """
+    The week of chart_str on every chart in chart_ids, fetched concurrently and compared.
+    Returns ({'Songs': ..., 'Artists': ...}, {chart name: error}) for the charts that
+    could not be loaded; the comparison covers the others.
+    """
+    loaded, errors = {}, {}
+    for chart_id, chart in get_week_charts(chart_str, chart_ids).items():
+        if isinstance(chart, Exception):
+            errors[get_chart_spec(chart_id).name] = str(chart)
+        else:
+            loaded[chart_id] = chart
+    return {"Songs": get_cross_chart_songs(loaded), "Artists": get_cross_chart_artists(loaded)}, errors
@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+
+MIN_DATE = date(1958, 8, 1)
+
+
+def get_saturday_of_week(date_input: date) -> str:
+    """
+    Given a date (datetime.date), return the Saturday of the same week (as 'YYYY-MM-DD').
+    The week is defined as Sunday (start) to Saturday (end).
+    """
+    weekday = (date_input.weekday() + 1) % 7  # Sunday=0, Monday=1, ..., Saturday=6
+    saturday = date_input + timedelta(days=(6 - weekday))
+    return saturday.strftime("%Y-%m-%d")
+
+
+def to_date(chart_str: str | date) -> date:
+    """Accepts either a 'YYYY-MM-DD' string or a date and returns a date."""
+    if isinstance(chart_str, date):
+        return chart_str
+    return date.fromisoformat(str(chart_str)[:10])
+
+
+def is_current_week(chart_str: str | date) -> bool:
+    """True if the chart date falls in the current (still changing) chart week or later."""
+    return get_saturday_of_week(to_date(chart_str)) >= get_saturday_of_week(date.today())
+
+
+def get_adjacent_chart_dates(chart_str: str | date, offsets: tuple[int, ...] = (-1, 1)) -> list[str]:
+    """
+    Returns the chart Saturdays the given number of weeks before/after chart_str.
+    Weeks after the current chart week are left out.
+    """
+    saturday = date.fromisoformat(get_saturday_of_week(to_date(chart_str)))
+    latest = get_saturday_of_week(date.today())
+
+    dates = [(saturday + timedelta(weeks=offset)).strftime("%Y-%m-%d") for offset in offsets]
+    return [d for d in dates if MIN_DATE.strftime("%Y-%m-%d") <= d <= latest]
@@ -0,0 +1,219 @@
+"""
+Chart exports to Excel, zipped CSV and Parquet.
+
+Every writer streams rows out as it goes (xlsxwriter in constant_memory mode, CSV
+straight into the zip member, one Parquet row group per frame), and a date range is
+exported one archived week at a time.
+
+    python -m util.export_util --start 2000-01-01 --end 2009-12-31 --format csv.zip --output 2000s.zip
+    python -m util.export_util --chart billboard-200 --start 2020-01-01 --end 2020-12-31 --output 2020.zip
+"""
+import argparse
+import io
+import os
+import tempfile
+import zipfile
+from importlib.util import find_spec
+
+import pandas as pd
+
+from util.chart_registry import CHARTS, DEFAULT_CHART
+from util.chart_store import iter_charts
+from util.history_store import is_history_store_current, open_history_store
+from util.perf_util import timed
+
+# ==============================================================================
+# 1. CONSTANTS
+# ==============================================================================
+
+# format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv.zip": ("zip", "application/zip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+EXCEL_MAX_ROWS = 1_048_576
+RANGE_COLUMNS = ["Chart Date", "Rank", "Title", "Artists", "Change", "Last Week", "Peak Position", "Total Weeks"]
+
+
+def is_format_available(fmt: str) -> bool:
+    """Excel needs xlsxwriter and Parquet needs pyarrow; both are imported only when exporting."""
+    module = {"xlsx": "xlsxwriter", "parquet": "pyarrow"}.get(fmt)
+    if module is None:
+        return fmt in EXPORT_FORMATS
+    # Only check that the library is installed, so listing the formats doesn't import it
+    return find_spec(module) is not None
+
+# ==============================================================================
+# 2. WRITERS
+# ==============================================================================
+
+def _rows(df: pd.DataFrame):
+    """Rows of df as plain Python values, with missing values as None."""
+    for row in df.astype(object).itertuples(index=False, name=None):
+        yield [None if pd.isna(v) else v for v in row]
+
+
+class _ExcelWriter:
+    """Writes sheets row by row with xlsxwriter's constant_memory mode."""
+
+    def __init__(self, path: str):
+        import xlsxwriter
+        self.workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.sheets = {}
+
+    def write(self, sheet_name: str, df: pd.DataFrame):
+        # Excel sheet names max length = 31
+        sheet_name = sheet_name[:31]
+        if sheet_name not in self.sheets:
+            worksheet = self.workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, list(df.columns))
+            self.sheets[sheet_name] = [worksheet, 1]
+
+        worksheet, next_row = self.sheets[sheet_name]
+        for row in _rows(df):
+            if next_row >= EXCEL_MAX_ROWS:
+                raise ValueError(f"Sheet '{sheet_name}' exceeds Excel's row limit. Use csv.zip or parquet.")
+            worksheet.write_row(next_row, 0, row)
+            next_row += 1
+        self.sheets[sheet_name][1] = next_row
+
+    def close(self):
+        self.workbook.close()
+
+
+class _CsvZipWriter:
+    """One CSV per sheet inside a zip. Sheets are written one after another."""
+
+    def __init__(self, path: str):
+        self.zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self.sheet_name = None
+        self.file = None
+
+    def write(self, sheet_name: str, df: pd.DataFrame):
+        if sheet_name != self.sheet_name:
+            # A zip can only have one member open for writing, so a sheet is finished
+            # once the next one starts
+            if self.file is not None:
+                self.file.close()
+            member = self.zip.open(f"{sheet_name}.csv", "w", force_zip64=True)
+            self.file = io.TextIOWrapper(member, encoding="utf-8", newline="")
+            self.sheet_name = sheet_name
+            df.to_csv(self.file, index=False)
+        else:
+            df.to_csv(self.file, index=False, header=False)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        self.zip.close()
+
+
+class _ParquetWriter:
+    """Single Parquet file with a 'Sheet' column, one row group per written frame."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writer = None
+
+    def write(self, sheet_name: str, df: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Category sets differ between frames, so store categoricals as plain strings
+        df = df.astype({c: "string" for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+        table = pa.Table.from_pandas(df.assign(Sheet=sheet_name), preserve_index=False)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+WRITERS = {"xlsx": _ExcelWriter, "csv.zip": _CsvZipWriter, "parquet": _ParquetWriter}
+
+# ==============================================================================
+# 3. EXPORTS
+# ==============================================================================
+
+def _read_and_remove(path: str) -> bytes:
+    with open(path, "rb") as f:
+        data = f.read()
+    os.remove(path)
+    return data
+
+
+def _get_union_dtype(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "string"
+    if pd.api.types.is_integer_dtype(dtype) and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        # int16 -> Int16, uint8 -> UInt8
+        return dtype.name.replace("uint", "UInt") if dtype.name.startswith("u") else dtype.name.capitalize()
+    return dtype
+
+
+@timed("export.sheets")
+def export_sheets(sheets: dict[str, pd.DataFrame], fmt: str = "xlsx") -> bytes:
+    """Exports named tables (one sheet / CSV each) to the given format and returns the file contents."""
+    if fmt == "parquet":
+        # Sections have different columns, so give every frame the union of columns. A column
+        # is missing (NA) in the frames that lack it, so integers become nullable integers
+        dtypes = {}
+        for data in sheets.values():
+            for column, dtype in data.dtypes.items():
+                dtypes.setdefault(column, _get_union_dtype(dtype))
+        sheets = {
+            name: data.reindex(columns=list(dtypes)).astype(dtypes) for name, data in sheets.items()
+        }
+
+    fd, path = tempfile.mkstemp(suffix=f".{EXPORT_FORMATS[fmt][0]}")
+    os.close(fd)
+    writer = WRITERS[fmt](path)
+    try:
+        for sheet_name, data in sheets.items():
+            writer.write(sheet_name, data)
+    finally:
+        writer.close()
+    return _read_and_remove(path)
+
+
+def export_chart_range(start: str, end: str, fmt: str, path: str, chart_id: str = DEFAULT_CHART) -> int:
+    """
+    Writes every archived chart_id week from start to end into one table at path, reading
+    and writing a single week at a time (a year at a time from an up-to-date history
+    store). Returns the number of weeks exported.
+    """
+    writer = WRITERS[fmt](path)
+    weeks = 0
+    try:
+        if chart_id == DEFAULT_CHART and is_history_store_current():
+            for df in open_history_store().iter_ranges(start, end):
+                df["Chart Date"] = df["Chart Date"].dt.strftime("%Y-%m-%d")
+                writer.write("Charts", df[RANGE_COLUMNS])
+                weeks += df["Chart Date"].nunique()
+            return weeks
+
+        for chart_date, chart in iter_charts(start, end, chart_id):
+            df = chart.to_dataframe().drop(columns="Artists List")
+            df.insert(0, "Chart Date", chart_date)
+            writer.write("Charts", df[RANGE_COLUMNS])
+            weeks += 1
+    finally:
+        writer.close()
+    return weeks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a range of archived chart weeks.")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv.zip")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--chart", choices=list(CHARTS), default=DEFAULT_CHART)
+    args = parser.parse_args()
+
+    weeks = export_chart_range(args.start, args.end, args.format, args.output, args.chart)
+    print(f"Exported {weeks} weeks to {args.output}")
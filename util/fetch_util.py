@@ -0,0 +1,279 @@
+"""
+HTTP layer for chart pages.
+
+Pages are downloaded through keep-alive sessions with compressed transfers (gzip and
+deflate, plus brotli when the optional `brotli` package is installed), connect and
+read timeouts on every request, and retries with backoff. Retries are capped by a
+RetryBudget shared by everything using the session, so a failing site sees a bounded
+amount of extra traffic instead of RETRY_TOTAL times every request.
+
+Every downloaded page is also kept, zlib-compressed, in a raw page cache next to the
+archive together with its ETag and Last-Modified headers. A page that is requested
+again is either served from the cache without the network (past weeks never change)
+or revalidated with a conditional request, so an unchanged current week costs a 304
+instead of a full download. The cache also lets a parser change re-parse the archive
+without downloading anything again (see `python -m util.backfill --reparse`).
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+from util.chart_store import ARCHIVE_PATH
+from util.perf_util import count, timed
+
+# ==============================================================================
+# 1. CONSTANTS
+# ==============================================================================
+
+TIMEOUT = (5, 30)           # seconds to connect, seconds between bytes read
+RETRY_TOTAL = 5
+RETRY_BACKOFF = 1.0         # sleeps 1s, 2s, 4s, ... between retries
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# Requests made on behalf of a visitor give up sooner than batch jobs
+APP_RETRY_TOTAL = 2
+APP_RETRY_BACKOFF = 0.5
+APP_POOL_SIZE = 4
+
+# Retries allowed per window: RETRY_BUDGET_RATIO of the requests made plus a minimum
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MIN = 10
+RETRY_BUDGET_WINDOW = 60.0
+
+RAW_CACHE = os.environ.get("BILLBOARD_RAW_CACHE", "1") != "0"
+RAW_CACHE_PATH = os.environ.get(
+    "BILLBOARD_RAW_CACHE_PATH", os.path.join(os.path.dirname(ARCHIVE_PATH), "raw_pages.sqlite3")
+)
+
+RAW_SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_pages (
+    cache_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL
+);
+"""
+
+_app_session: requests.Session | None = None
+_app_session_lock = threading.Lock()
+
+# ==============================================================================
+# 2. SESSIONS
+# ==============================================================================
+
+class RetryBudget:
+    """
+    Allows retries up to ratio of the requests made in the last window seconds, plus
+    minimum retries per window. Shared across threads.
+    """
+
+    def __init__(
+            self, ratio: float = RETRY_BUDGET_RATIO, minimum: int = RETRY_BUDGET_MIN,
+            window: float = RETRY_BUDGET_WINDOW
+        ):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window = window
+        self.requests: deque[float] = deque()
+        self.retries: deque[float] = deque()
+        self.lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        for events in (self.requests, self.retries):
+            while events and events[0] < now - self.window:
+                events.popleft()
+
+    def record_request(self) -> None:
+        now = time.monotonic()
+        with self.lock:
+            self._trim(now)
+            self.requests.append(now)
+
+    def try_retry(self) -> bool:
+        """Takes one retry from the budget; False if it is spent."""
+        now = time.monotonic()
+        with self.lock:
+            self._trim(now)
+            if len(self.retries) >= self.minimum + self.ratio * len(self.requests):
+                return False
+            self.retries.append(now)
+            return True
+
+
+class BudgetedRetry(Retry):
+    """urllib3 Retry that also stops once its RetryBudget is spent."""
+    budget: RetryBudget | None = None
+
+    def new(self, **kw) -> "BudgetedRetry":
+        retry = super().new(**kw)
+        retry.budget = self.budget
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # The base class raises first when the attempts are used up or the error is not retryable
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if self.budget is not None and not self.budget.try_retry():
+            count("http.retry_budget_exhausted")
+            raise MaxRetryError(_pool, url, error or ResponseError("retry budget exhausted"))
+        count("http.retry")
+        return retry
+
+
+class _BudgetedAdapter(HTTPAdapter):
+    """Counts every request against the budget and applies the default timeout."""
+
+    def __init__(self, budget: RetryBudget, timeout, **kwargs):
+        self.budget = budget
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        self.budget.record_request()
+        return super().send(request, **kwargs)
+
+
+def create_session(
+        pool_size: int = 8, retries: int = RETRY_TOTAL, backoff: float = RETRY_BACKOFF,
+        timeout=TIMEOUT, budget: RetryBudget | None = None
+    ) -> requests.Session:
+    """
+    Creates a keep-alive session with a connection pool sized for pool_size threads,
+    compressed transfers, a default timeout and retry with backoff under one retry budget.
+    """
+    retry = BudgetedRetry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=["GET"]
+    )
+    retry.budget = budget or RetryBudget()
+    adapter = _BudgetedAdapter(
+        retry.budget, timeout, pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+
+    session = requests.Session()
+    session.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """The session shared by every app session of this process, created on first use."""
+    global _app_session
+    with _app_session_lock:
+        if _app_session is None:
+            _app_session = create_session(APP_POOL_SIZE, APP_RETRY_TOTAL, APP_RETRY_BACKOFF)
+        return _app_session
+
+# ==============================================================================
+# 3. RAW PAGE CACHE
+# ==============================================================================
+
+@dataclass
+class RawPage:
+    body: bytes
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@contextmanager
+def _connect_raw():
+    os.makedirs(os.path.dirname(RAW_CACHE_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(RAW_CACHE_PATH, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(RAW_SCHEMA)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_raw_page(cache_key: str) -> RawPage | None:
+    if not RAW_CACHE:
+        return None
+    with _connect_raw() as conn:
+        row = conn.execute(
+            "SELECT body, fetched_at, etag, last_modified FROM raw_pages WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+    if row is None:
+        return None
+    return RawPage(zlib.decompress(row[0]), *row[1:])
+
+
+def save_raw_page(cache_key: str, url: str, response: requests.Response) -> None:
+    if not RAW_CACHE:
+        return
+    with _connect_raw() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO raw_pages (cache_key, url, fetched_at, etag, last_modified, body) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (cache_key, url, time.time(), response.headers.get("ETag"),
+             response.headers.get("Last-Modified"), zlib.compress(response.content))
+        )
+
+
+def forget_raw_page(cache_key: str) -> None:
+    """Drops a cached page, e.g. one that turned out not to contain a chart."""
+    if not RAW_CACHE:
+        return
+    with _connect_raw() as conn:
+        conn.execute("DELETE FROM raw_pages WHERE cache_key = ?", (cache_key,))
+
+# ==============================================================================
+# 4. FETCH
+# ==============================================================================
+
+@timed("http.fetch")
+def fetch_page(
+        url: str, cache_key: str | None = None, session: requests.Session | None = None,
+        revalidate: bool = True
+    ) -> bytes:
+    """
+    Downloads url and returns its body. With a cache_key, the body is kept in the raw
+    page cache and a cached copy is returned without the network, or, if revalidate is
+    set, after a conditional request answered with 304 Not Modified.
+    Raises requests.HTTPError on an error status and ValueError on an empty page.
+    """
+    cached = load_raw_page(cache_key) if cache_key else None
+    if cached is not None and not revalidate:
+        count("raw_cache.hit")
+        return cached.body
+
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    response = (session or get_session()).get(url, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        count("http.not_modified")
+        return cached.body
+
+    response.raise_for_status()
+    if not response.content.strip():
+        raise ValueError(f"{url} returned an empty page")
+
+    count("http.downloaded_bytes", len(response.content))
+    if cache_key:
+        save_raw_page(cache_key, url, response)
+    return response.content
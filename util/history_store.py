@@ -0,0 +1,214 @@
+"""
+Memory-mapped columnar copy of the whole Hot 100 archive for range analysis.
+
+    python -m util.history_store        # (re)build it from the archive
+
+Every archived week is laid out back to back in flat .npy columns: int16 ranks, last
+weeks, peaks and weeks on chart, plus int32 codes into dictionaries of the distinct
+titles and artist credits. The files are opened with memory mapping, so every session
+of every process shares one read-only copy in the OS page cache. A date range is a
+contiguous slice of rows that is turned into a DataFrame without copying the columns.
+
+A build writes a new version directory and then switches the CURRENT pointer, so
+readers never see a half-written store and keep their old mapping until they reopen.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from ChartData import COLUMNS, make_chart_frame
+from util.chart_registry import DEFAULT_CHART
+from util.chart_store import ARCHIVE_PATH, connect, decode_entries, get_archive_key
+from util.perf_util import timed
+
+HISTORY_DIR = os.environ.get(
+    "BILLBOARD_HISTORY_DIR", os.path.join(os.path.dirname(ARCHIVE_PATH), "history")
+)
+
+INT16_COLUMNS = ["rank", "last_week", "peak", "weeks"]
+RANGE_COLUMNS = ["Chart Date", *[c for c in COLUMNS if c != "Artists List"]]
+
+_store = None
+_store_version = None
+_store_lock = threading.Lock()
+
+# ==============================================================================
+# 1. BUILD
+# ==============================================================================
+
+def _get_archive_version(conn) -> list:
+    return list(conn.execute(
+        "SELECT COUNT(*), MAX(fetched_at) FROM charts WHERE chart = ?", (DEFAULT_CHART,)
+    ).fetchone())
+
+
+def _read_current(path: str) -> str | None:
+    try:
+        with open(os.path.join(path, "CURRENT")) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+@timed("history.build")
+def build_history_store(path: str | None = None) -> int:
+    """Writes the whole archive into a new store version. Returns the number of weeks."""
+    path = path or HISTORY_DIR
+    dates, offsets = [], [0]
+    columns = {name: [] for name in INT16_COLUMNS}
+    title_codes, artist_codes = [], []
+    titles, artists, artists_lists = {}, {}, []
+
+    with connect() as conn:
+        archive_version = _get_archive_version(conn)
+        cursor = conn.execute(
+            "SELECT chart_date, entries FROM charts WHERE chart = ? ORDER BY chart_date", (DEFAULT_CHART,)
+        )
+        for chart_date, entries in cursor:
+            chart = decode_entries(entries)
+            dates.append(chart_date)
+            offsets.append(offsets[-1] + len(chart))
+            columns["rank"].extend(chart.ranks)
+            columns["last_week"].extend(chart.last_weeks)
+            columns["peak"].extend(chart.peak_positions)
+            columns["weeks"].extend(chart.total_weeks)
+            for title, credit, artists_list in zip(chart.titles, chart.artists, chart.artists_lists):
+                title_codes.append(titles.setdefault(title, len(titles)))
+                code = artists.setdefault(credit, len(artists))
+                if code == len(artists_lists):
+                    artists_lists.append(artists_list)
+                artist_codes.append(code)
+
+    version = f"v{time.time_ns()}"
+    target = os.path.join(path, version)
+    os.makedirs(target)
+    np.save(os.path.join(target, "dates.npy"), np.array(dates, dtype="datetime64[D]"))
+    np.save(os.path.join(target, "offsets.npy"), np.array(offsets, dtype=np.int64))
+    for name, values in columns.items():
+        np.save(os.path.join(target, f"{name}.npy"), np.array(values, dtype=np.int16))
+    np.save(os.path.join(target, "title.npy"), np.array(title_codes, dtype=np.int32))
+    np.save(os.path.join(target, "artist.npy"), np.array(artist_codes, dtype=np.int32))
+    with open(os.path.join(target, "dictionaries.json"), "w") as f:
+        json.dump({
+            "archive_version": archive_version,
+            "titles": list(titles),
+            "artists": list(artists),
+            "artists_lists": artists_lists,
+        }, f)
+
+    # Switch readers over atomically, then drop older versions (open mappings stay valid)
+    tmp_pointer = os.path.join(path, "CURRENT.tmp")
+    with open(tmp_pointer, "w") as f:
+        f.write(version)
+    os.replace(tmp_pointer, os.path.join(path, "CURRENT"))
+    for name in os.listdir(path):
+        if name.startswith("v") and name != version:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    return len(dates)
+
+
+def is_history_store_current(path: str | None = None) -> bool:
+    """True if the store exists and was built from the archive as it is now."""
+    store = open_history_store(path)
+    with connect() as conn:
+        return store is not None and store.archive_version == _get_archive_version(conn)
+
+# ==============================================================================
+# 2. READ
+# ==============================================================================
+
+class HistoryStore:
+    """Read-only view of one store version; all columns are memory mapped."""
+
+    def __init__(self, path: str):
+        def load(name):
+            # Plain ndarray views on the mapping, so frames don't carry the memmap subclass
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r").view(np.ndarray)
+
+        self.dates = load("dates")
+        self.offsets = load("offsets")
+        self.rank, self.last_week, self.peak, self.weeks = (load(name) for name in INT16_COLUMNS)
+        self.title_codes = load("title")
+        self.artist_codes = load("artist")
+        with open(os.path.join(path, "dictionaries.json")) as f:
+            dictionaries = json.load(f)
+        self.archive_version = dictionaries["archive_version"]
+        self.titles = pd.Index(dictionaries["titles"], dtype=object)
+        self.artists = pd.Index(dictionaries["artists"], dtype=object)
+        self.artists_lists = dictionaries["artists_lists"]
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def _rows(self, start: str, end: str) -> tuple[slice, slice]:
+        """(week slice, row slice) covering the weeks from start to end inclusive."""
+        first = np.searchsorted(self.dates, np.datetime64(start, "D"), side="left")
+        last = np.searchsorted(self.dates, np.datetime64(end, "D"), side="right")
+        return slice(first, last), slice(int(self.offsets[first]), int(self.offsets[last]))
+
+    def has_week(self, chart_str) -> bool:
+        weeks, _ = self._rows(get_archive_key(chart_str), get_archive_key(chart_str))
+        return weeks.stop > weeks.start
+
+    def get_week(self, chart_str) -> pd.DataFrame:
+        """One week as the same DataFrame ChartData.to_dataframe builds (empty if not stored)."""
+        key = get_archive_key(chart_str)
+        _, rows = self._rows(key, key)
+        artist_codes = self.artist_codes[rows]
+        return make_chart_frame(
+            self.rank[rows],
+            pd.array(self.titles.take(self.title_codes[rows]), dtype="str"),
+            pd.array(self.artists.take(artist_codes), dtype="str"),
+            [self.artists_lists[code] for code in artist_codes],
+            self.last_week[rows], self.peak[rows], self.weeks[rows]
+        )
+
+    @timed("history.range")
+    def get_range(self, start: str, end: str) -> pd.DataFrame:
+        """
+        Every stored week from start to end as one frame (RANGE_COLUMNS). Rank columns
+        are views on the mapped files; titles and artists are categoricals over the
+        shared dictionaries.
+        """
+        weeks, rows = self._rows(start, end)
+        counts = np.diff(self.offsets[weeks.start:weeks.stop + 1])
+        frame = make_chart_frame(
+            self.rank[rows],
+            pd.Categorical.from_codes(self.title_codes[rows], categories=self.titles, validate=False),
+            pd.Categorical.from_codes(self.artist_codes[rows], categories=self.artists, validate=False),
+            None, self.last_week[rows], self.peak[rows], self.weeks[rows]
+        )
+        frame.insert(0, "Chart Date", np.repeat(self.dates[weeks], counts))
+        return frame[RANGE_COLUMNS]
+
+    def iter_ranges(self, start: str, end: str, weeks_per_chunk: int = 52):
+        """get_range from start to end in chunks of weeks_per_chunk weeks, oldest first."""
+        weeks, _ = self._rows(start, end)
+        for first in range(weeks.start, weeks.stop, weeks_per_chunk):
+            last = min(first + weeks_per_chunk, weeks.stop) - 1
+            yield self.get_range(str(self.dates[first]), str(self.dates[last]))
+
+
+def open_history_store(path: str | None = None) -> HistoryStore | None:
+    """The current store, opened once per process and reopened after a rebuild; None if never built."""
+    global _store, _store_version
+    path = path or HISTORY_DIR
+    version = _read_current(path)
+    if version is None:
+        return None
+
+    with _store_lock:
+        if (path, version) != _store_version:
+            _store, _store_version = HistoryStore(os.path.join(path, version)), (path, version)
+        return _store
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    weeks = build_history_store()
+    print(f"Stored {weeks} weeks in {HISTORY_DIR} in {time.perf_counter() - started:.1f} s")
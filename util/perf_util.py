@@ -0,0 +1,196 @@
+"""
+Hot-path timings and counters.
+
+Stages are timed with the `timed` decorator or the `track` context manager and
+events are counted with `count`. Everything is kept per process (shared by all
+sessions) and can be read three ways:
+
+- structured JSON log lines on the "billboard.perf" logger (BILLBOARD_PERF_LOG=1
+  prints them to stderr),
+- a Prometheus text file rewritten after every page run (BILLBOARD_METRICS_FILE),
+  for the node_exporter textfile collector or any scraper,
+- a debug sidebar on every page (open the app with ?debug=1 or set BILLBOARD_DEBUG=1).
+
+The first page run of a process also records "startup.first_render": seconds from
+process start to the end of that run, i.e. the cold-start time a visitor waits through.
+"""
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("billboard.perf")
+if os.environ.get("BILLBOARD_PERF_LOG") and not logger.handlers:
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+
+METRICS_FILE = os.environ.get("BILLBOARD_METRICS_FILE")
+
+_lock = threading.Lock()
+_timings: dict[str, dict[str, float]] = {}
+_counters: dict[str, int] = {}
+_imported_at = time.perf_counter()
+_first_render_recorded = False
+
+# ==============================================================================
+# 1. RECORDING
+# ==============================================================================
+
+def record(stage: str, seconds: float) -> None:
+    with _lock:
+        stats = _timings.setdefault(stage, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        stats["last"] = seconds
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": "stage", "stage": stage, "ms": round(seconds * 1000, 3)}))
+
+
+def count(name: str, n: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": "count", "name": name, "n": n}))
+
+
+@contextmanager
+def track(stage: str):
+    """Times the body of a with-block as stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def timed(stage: str):
+    """Decorator that times every call of the function as stage. Return values are untouched."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# ==============================================================================
+# 2. READING
+# ==============================================================================
+
+def snapshot() -> dict[str, dict]:
+    """Copy of all stage timings (seconds) and counters."""
+    with _lock:
+        return {
+            "timings": {stage: dict(stats) for stage, stats in _timings.items()},
+            "counters": dict(_counters),
+        }
+
+
+def reset() -> None:
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = [
+        "# TYPE billboard_stage_seconds_total counter",
+        "# TYPE billboard_stage_calls_total counter",
+        "# TYPE billboard_stage_seconds_max gauge",
+        "# TYPE billboard_events_total counter",
+    ]
+    for stage, stats in sorted(data["timings"].items()):
+        lines.append(f'billboard_stage_seconds_total{{stage="{stage}"}} {stats["total"]:.6f}')
+        lines.append(f'billboard_stage_calls_total{{stage="{stage}"}} {stats["count"]}')
+        lines.append(f'billboard_stage_seconds_max{{stage="{stage}"}} {stats["max"]:.6f}')
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f'billboard_events_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path: str) -> None:
+    # Write then rename so a scraper never reads a half-written file. Every session's
+    # script thread (and every process) writes its own temp file, so concurrent writers
+    # never rename a file out from under each other
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(render_prometheus())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+# ==============================================================================
+# 3. STARTUP
+# ==============================================================================
+
+def get_process_age() -> float:
+    """Seconds since this process started (from /proc on Linux, else since this module was imported)."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, AttributeError, ValueError, IndexError):
+        return time.perf_counter() - _imported_at
+
+
+def record_first_render() -> None:
+    global _first_render_recorded
+    with _lock:
+        if _first_render_recorded:
+            return
+        _first_render_recorded = True
+    record("startup.first_render", get_process_age())
+
+# ==============================================================================
+# 4. STREAMLIT
+# ==============================================================================
+
+def is_debug_enabled() -> bool:
+    import streamlit as st
+    return os.environ.get("BILLBOARD_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+def report_page_metrics() -> None:
+    """
+    Call at the end of every page: records the process's first render, rewrites
+    BILLBOARD_METRICS_FILE if configured and, in debug mode, shows the timings and
+    counters in the sidebar.
+    """
+    record_first_render()
+    if METRICS_FILE:
+        write_metrics_file(METRICS_FILE)
+
+    if not is_debug_enabled():
+        return
+
+    import pandas as pd
+    import streamlit as st
+
+    data = snapshot()
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        timings = pd.DataFrame([
+            {
+                "Stage": stage, "Calls": stats["count"],
+                "Last ms": stats["last"] * 1000,
+                "Avg ms": stats["total"] / stats["count"] * 1000,
+                "Max ms": stats["max"] * 1000,
+            }
+            for stage, stats in sorted(data["timings"].items())
+        ])
+        st.dataframe(timings, hide_index=True, use_container_width=True)
+
+        counters = pd.DataFrame(sorted(data["counters"].items()), columns=["Event", "Count"])
+        st.dataframe(counters, hide_index=True, use_container_width=True)
+
+        if st.button("Reset metrics"):
+            reset()
@@ -0,0 +1,239 @@
+"""
+Song and artist search over the whole chart archive.
+
+Every word of a song's title and artist names is stored in an inverted index
+(token -> song, token -> artist) next to the archive, together with one summary row
+per song and artist (first week, peak, weeks on chart). Query words match as
+prefixes through the token index ("tay swi" finds Taylor Swift). A word with no
+prefix match falls back to close spellings ("beyonse" finds Beyoncé). Like the other
+indexes, it is synced incrementally from the weeks archived since the last sync: by the
+weekly updater, and by queries at most once every SYNC_INTERVAL_SECONDS per process.
+"""
+import difflib
+import math
+import threading
+import time
+
+import pandas as pd
+
+from util.artist_stats import sync_artist_index
+from util.artist_util import canonical_artist_key, fold_text
+from util.chart_store import connect, iter_unindexed_charts, mark_indexed
+from util.perf_util import timed
+from util.song_index import make_song_key, sync_song_index
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS song_tokens (
+    token TEXT NOT NULL,
+    song_key TEXT NOT NULL,
+    PRIMARY KEY (token, song_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS artist_tokens (
+    token TEXT NOT NULL,
+    artist_key TEXT NOT NULL,
+    PRIMARY KEY (token, artist_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS song_summaries (
+    song_key TEXT PRIMARY KEY,
+    first_week TEXT NOT NULL,
+    peak INTEGER NOT NULL,
+    weeks INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS song_summaries_by_weeks ON song_summaries (weeks);
+CREATE TABLE IF NOT EXISTS artist_summaries (
+    artist_key TEXT PRIMARY KEY,
+    first_week TEXT NOT NULL,
+    peak INTEGER NOT NULL,
+    weeks INTEGER NOT NULL,
+    songs INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS search_index_weeks (
+    chart_date TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+"""
+
+SONG_RESULT_COLUMNS = ["Title", "Artists", "First Week", "Peak", "Weeks on Chart"]
+ARTIST_RESULT_COLUMNS = ["Artist", "First Week", "Peak", "Weeks on Chart", "Songs"]
+
+MIN_PREFIX_LENGTH = 2       # shorter words only match whole tokens
+MIN_FUZZY_LENGTH = 4        # shorter words are too ambiguous for spelling fallbacks
+FUZZY_CUTOFF = 0.8
+MAX_FUZZY_MATCHES = 5
+
+# Queries pick up weeks archived by the app itself this often; the updater syncs right away
+SYNC_INTERVAL_SECONDS = 60
+_synced_at = None
+_sync_lock = threading.Lock()
+
+# Distinct tokens for the spelling fallback by (first letter, length), reloaded when the index changes
+_vocabulary: dict[tuple[str, int], list[str]] = {}
+_vocabulary_version = None
+_vocabulary_lock = threading.Lock()
+
+# ==============================================================================
+# 1. INDEXING
+# ==============================================================================
+
+def tokenize(text: str) -> set[str]:
+    return set(fold_text(text).split())
+
+
+def _refresh_summaries(conn) -> None:
+    # Summaries of every song and artist seen in the weeks just indexed, from their full history
+    conn.executescript("""
+        INSERT OR REPLACE INTO song_summaries (song_key, first_week, peak, weeks)
+        SELECT song_key, MIN(chart_date), MIN(rank), COUNT(*)
+        FROM song_weeks WHERE song_key IN (SELECT song_key FROM touched_songs)
+        GROUP BY song_key;
+
+        INSERT OR REPLACE INTO artist_summaries (artist_key, first_week, peak, weeks, songs)
+        SELECT artist_key, MIN(chart_date), MIN(rank), COUNT(DISTINCT chart_date), COUNT(DISTINCT song_key)
+        FROM artist_entries WHERE artist_key IN (SELECT artist_key FROM touched_artists)
+        GROUP BY artist_key;
+
+        DROP TABLE touched_songs;
+        DROP TABLE touched_artists;
+    """)
+
+
+def sync_search_index() -> int:
+    """Indexes the archived weeks that are new since the last sync. Returns how many were indexed."""
+    sync_song_index()
+    sync_artist_index()
+
+    synced = 0
+    with connect() as conn:
+        conn.executescript(SCHEMA + """
+            CREATE TEMP TABLE touched_songs (song_key TEXT PRIMARY KEY);
+            CREATE TEMP TABLE touched_artists (artist_key TEXT PRIMARY KEY);
+        """)
+        for chart_date, fetched_at, chart in iter_unindexed_charts(conn, "search_index_weeks"):
+            song_tokens, artist_tokens = set(), set()
+            for title, artists, artists_list in zip(chart.titles, chart.artists, chart.artists_lists):
+                song_key = make_song_key(title, artists)
+                song_tokens.update((token, song_key) for token in tokenize(f"{title} {artists}"))
+                for artist in artists_list:
+                    artist_key = canonical_artist_key(artist)
+                    artist_tokens.update((token, artist_key) for token in tokenize(artist))
+
+            conn.executemany("INSERT OR IGNORE INTO song_tokens (token, song_key) VALUES (?, ?)", song_tokens)
+            conn.executemany("INSERT OR IGNORE INTO artist_tokens (token, artist_key) VALUES (?, ?)", artist_tokens)
+            conn.executemany(
+                "INSERT OR IGNORE INTO touched_songs (song_key) VALUES (?)", {(key,) for _, key in song_tokens}
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO touched_artists (artist_key) VALUES (?)", {(key,) for _, key in artist_tokens}
+            )
+            mark_indexed(conn, "search_index_weeks", chart_date, fetched_at)
+            synced += 1
+        _refresh_summaries(conn)
+    return synced
+
+
+def _sync_if_due() -> None:
+    # A no-op sync still checks three indexes against the archive (~30 ms), too much per query
+    global _synced_at
+    with _sync_lock:
+        if _synced_at is None or time.monotonic() - _synced_at >= SYNC_INTERVAL_SECONDS:
+            sync_search_index()
+            _synced_at = time.monotonic()
+
+# ==============================================================================
+# 2. MATCHING
+# ==============================================================================
+
+def _get_vocabulary(conn) -> dict[tuple[str, int], list[str]]:
+    """Distinct indexed tokens grouped by first letter and length, cached until the index changes."""
+    global _vocabulary, _vocabulary_version
+    version = conn.execute("SELECT COUNT(*), MAX(fetched_at) FROM search_index_weeks").fetchone()
+    with _vocabulary_lock:
+        if version != _vocabulary_version:
+            vocabulary = {}
+            for (token,) in conn.execute("SELECT DISTINCT token FROM song_tokens"):
+                vocabulary.setdefault((token[0], len(token)), []).append(token)
+            _vocabulary, _vocabulary_version = vocabulary, version
+        return _vocabulary
+
+
+def _get_fuzzy_candidates(conn, word: str) -> list[str]:
+    """
+    Tokens with word's first letter whose length lets them reach FUZZY_CUTOFF at all:
+    a difflib ratio is at most 2 * shorter / (len(word) + len(token)).
+    """
+    vocabulary = _get_vocabulary(conn)
+    # The tolerance keeps lengths that reach the cutoff exactly despite float rounding
+    shortest = math.ceil(len(word) * FUZZY_CUTOFF / (2 - FUZZY_CUTOFF) - 1e-9)
+    longest = math.floor(len(word) * (2 - FUZZY_CUTOFF) / FUZZY_CUTOFF + 1e-9)
+    return [
+        token for length in range(shortest, longest + 1) for token in vocabulary.get((word[0], length), [])
+    ]
+
+
+def _token_condition(conn, word: str, tokens_table: str) -> tuple[str, list[str]]:
+    """SQL condition on a 'token' column (and its parameters) for the tokens that match word."""
+    if len(word) >= MIN_PREFIX_LENGTH:
+        # Every token that starts with word sorts between word and word + the highest code point
+        condition, params = "(token >= ? AND token < ?)", [word, word + "\U0010ffff"]
+        if conn.execute(f"SELECT 1 FROM {tokens_table} WHERE {condition} LIMIT 1", params).fetchone():
+            return condition, params
+    else:
+        condition, params = "token = ?", [word]
+
+    if len(word) >= MIN_FUZZY_LENGTH:
+        candidates = _get_fuzzy_candidates(conn, word)
+        close = difflib.get_close_matches(word, candidates, n=MAX_FUZZY_MATCHES, cutoff=FUZZY_CUTOFF)
+        if close:
+            return f"token IN ({','.join('?' * len(close))})", close
+    return condition, params
+
+
+def _match_clause(conn, words: list[str], key: str, tokens_table: str) -> tuple[str, list[str]]:
+    # A result must match every word of the query
+    clauses, params = [], []
+    for word in words:
+        condition, word_params = _token_condition(conn, word, tokens_table)
+        clauses.append(f"m.{key} IN (SELECT {key} FROM {tokens_table} WHERE {condition})")
+        params.extend(word_params)
+    return " AND ".join(clauses), params
+
+# ==============================================================================
+# 3. SEARCH
+# ==============================================================================
+
+@timed("search.query")
+def search(query: str, limit: int = 20) -> dict[str, pd.DataFrame]:
+    """
+    Songs and artists whose title or names match every word of query, as prefixes
+    or close spellings, keyed 'Songs' and 'Artists' and ordered by weeks on chart.
+    """
+    _sync_if_due()
+    words = sorted(tokenize(query), key=len, reverse=True)
+    if not words:
+        return {
+            "Songs": pd.DataFrame(columns=SONG_RESULT_COLUMNS),
+            "Artists": pd.DataFrame(columns=ARTIST_RESULT_COLUMNS),
+        }
+
+    with connect() as conn:
+        where, params = _match_clause(conn, words, "song_key", "song_tokens")
+        songs = pd.read_sql_query(f"""
+            SELECT s.title AS "Title", s.artists AS "Artists", m.first_week AS "First Week",
+                   m.peak AS "Peak", m.weeks AS "Weeks on Chart"
+            FROM song_summaries m JOIN songs s ON s.song_key = m.song_key
+            WHERE {where}
+            ORDER BY m.weeks DESC, m.peak
+            LIMIT ?
+        """, conn, params=(*params, limit))
+
+        where, params = _match_clause(conn, words, "artist_key", "artist_tokens")
+        artists = pd.read_sql_query(f"""
+            SELECT a.name AS "Artist", m.first_week AS "First Week", m.peak AS "Peak",
+                   m.weeks AS "Weeks on Chart", m.songs AS "Songs"
+            FROM artist_summaries m JOIN artists a ON a.artist_key = m.artist_key
+            WHERE {where}
+            ORDER BY m.weeks DESC, m.peak
+            LIMIT ?
+        """, conn, params=(*params, limit))
+
+    return {"Songs": songs, "Artists": artists}
@@ -0,0 +1,93 @@
+"""
+Song history index: song identity -> (chart week, rank, weeks on chart) for every archived week.
+
+The index lives next to the archive and is brought up to date incrementally: only
+weeks that were archived (or re-fetched) since the last sync are read.
+"""
+import hashlib
+import re
+from itertools import repeat
+
+import pandas as pd
+
+from util.chart_store import connect, iter_unindexed_charts, mark_indexed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    song_key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    artists TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS song_weeks (
+    song_key TEXT NOT NULL,
+    chart_date TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    weeks INTEGER NOT NULL,
+    PRIMARY KEY (song_key, chart_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS song_weeks_by_date ON song_weeks (chart_date);
+CREATE TABLE IF NOT EXISTS song_index_weeks (
+    chart_date TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+"""
+
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Case- and spacing-insensitive form of a title or artist credit."""
+    return _whitespace.sub(" ", str(text).replace("Featuring", "ft.")).strip().casefold()
+
+
+def make_song_key(title: str, artists: str) -> str:
+    """Stable identity of a song: a short hash of its normalized title and artist credit."""
+    raw = f"{normalize_text(title)}\x1f{normalize_text(artists)}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+def _create_schema(conn) -> None:
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(song_weeks)")]
+    if columns and "weeks" not in columns:
+        # Rows from before weeks on chart were indexed: drop them so the next sync rebuilds them
+        conn.executescript("DROP TABLE song_weeks; DROP TABLE IF EXISTS song_index_weeks;")
+    conn.executescript(SCHEMA)
+
+
+def sync_song_index() -> int:
+    """Indexes the archived weeks that are new since the last sync. Returns how many were indexed."""
+    synced = 0
+    with connect() as conn:
+        _create_schema(conn)
+        for chart_date, fetched_at, chart in iter_unindexed_charts(conn, "song_index_weeks"):
+            keys = [make_song_key(t, a) for t, a in zip(chart.titles, chart.artists)]
+
+            conn.execute("DELETE FROM song_weeks WHERE chart_date = ?", (chart_date,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO songs (song_key, title, artists) VALUES (?, ?, ?)",
+                zip(keys, chart.titles, chart.artists)
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO song_weeks (song_key, chart_date, rank, weeks) VALUES (?, ?, ?, ?)",
+                zip(keys, repeat(chart_date), chart.ranks, chart.total_weeks)
+            )
+            mark_indexed(conn, "song_index_weeks", chart_date, fetched_at)
+            synced += 1
+    return synced
+
+
+def get_song_history(title: str, artists: str) -> pd.DataFrame:
+    """
+    Returns every archived week the song charted, oldest first, with columns
+    'Chart Date' and 'Rank'.
+    """
+    sync_song_index()
+    with connect() as conn:
+        rows = conn.execute(
+            "SELECT chart_date, rank FROM song_weeks WHERE song_key = ? ORDER BY chart_date",
+            (make_song_key(title, artists),)
+        ).fetchall()
+
+    history = pd.DataFrame(rows, columns=["Chart Date", "Rank"])
+    history["Chart Date"] = pd.to_datetime(history["Chart Date"])
+    return history
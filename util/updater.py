@@ -0,0 +1,183 @@
+"""
+Weekly update job: archives the chart weeks published since the last archived one and
+brings the derived indexes (song histories, artist stats, year-end totals, search) and
+the memory-mapped history store up to date.
+
+    python -m util.updater              # fetch, validate, archive and re-index
+    python -m util.updater --dry-run    # only list the weeks that would be fetched
+    python -m util.updater --chart hot-100 --chart billboard-200    # several charts at once
+
+Run it on a schedule shortly after the weekly chart release and start the app with
+BILLBOARD_OFFLINE=1 so user requests only read the archive. Re-running is safe:
+archived weeks are not fetched again and the indexes only pick up weeks they have
+not seen yet.
+"""
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from util.artist_stats import sync_artist_index
+from util.chart_registry import CHARTS, DEFAULT_CHART, get_week_label, resolve_chart_ids
+from util.chart_store import list_chart_dates, load_chart, mark_checked, save_chart
+from util.chart_util import fetch_chart, validate_chart
+from util.date_util import get_saturday_of_week, is_current_week
+from util.fetch_util import create_session
+from util.history_store import build_history_store, is_history_store_current
+from util.search_index import sync_search_index
+from util.song_index import sync_song_index
+from util.year_end import sync_year_end
+
+# ==============================================================================
+# 1. HELPERS
+# ==============================================================================
+
+def get_pending_weeks(today: date | None = None, chart_id: str = DEFAULT_CHART) -> list[str]:
+    """
+    Weeks of chart_id to fetch, oldest first: every week after the last archived one up
+    to the current week, plus the current week again if its archived copy has gone stale.
+    An empty archive only gets the current week (use util.backfill for history).
+    """
+    today = today or date.today()
+    current = get_saturday_of_week(today)
+    archived = list_chart_dates(chart_id)
+    if not archived:
+        return [current]
+
+    pending = []
+    week = date.fromisoformat(archived[-1]) + timedelta(days=7)
+    while week.strftime("%Y-%m-%d") <= current:
+        pending.append(week.strftime("%Y-%m-%d"))
+        week += timedelta(days=7)
+
+    if archived[-1] == current and load_chart(current, chart_id=chart_id) is None:
+        pending.append(current)
+    return pending
+
+
+@dataclass
+class UpdateResult:
+    # Weeks are named as in util.chart_registry.get_week_label
+    pending: list[str] = field(default_factory=list)
+    archived: list[str] = field(default_factory=list)
+    unpublished: list[str] = field(default_factory=list)
+    rejected: dict[str, list[str]] = field(default_factory=dict)
+    failed: dict[str, str] = field(default_factory=dict)
+    indexed: dict[str, int] = field(default_factory=dict)
+
+# ==============================================================================
+# 2. UPDATE
+# ==============================================================================
+
+def _update_week(
+        chart_date: str, url_date: str, previous_week: str, session, base_url: str | None,
+        result: UpdateResult, chart_id: str
+    ) -> str:
+    label = get_week_label(chart_id, chart_date)
+    try:
+        chart = fetch_chart(url_date, session, base_url, chart_id)
+    except Exception as e:
+        result.failed[label] = str(e)
+        return "failed"
+
+    problems = validate_chart(chart, chart_id, chart_date)
+    if not problems and chart == load_chart(chart_date, allow_stale=True, chart_id=chart_id):
+        # A re-check of the current week that found nothing new: keep the stored copy
+        # so the indexes have nothing to redo
+        mark_checked(chart_date, chart_id)
+        return "unchanged"
+    if not problems and chart == load_chart(previous_week, allow_stale=True, chart_id=chart_id):
+        # Before the weekly release the site still serves last week's chart
+        if is_current_week(chart_date):
+            result.unpublished.append(label)
+            return "not published yet"
+        problems = ["identical to the previous week"]
+    if problems:
+        result.rejected[label] = problems
+        return "rejected"
+
+    save_chart(chart_date, chart, chart_id)
+    result.archived.append(label)
+    return "archived"
+
+
+def _update_chart(
+        chart_id: str, weeks: list[str], session, base_url: str | None, result: UpdateResult, progress
+    ) -> None:
+    for chart_date in weeks:
+        # The current week's chart is served under today's date, not its Saturday
+        url_date = date.today().strftime("%Y-%m-%d") if is_current_week(chart_date) else chart_date
+        previous_week = (date.fromisoformat(chart_date) - timedelta(days=7)).strftime("%Y-%m-%d")
+        status = _update_week(chart_date, url_date, previous_week, session, base_url, result, chart_id)
+        if progress:
+            progress(get_week_label(chart_id, chart_date), status)
+        if status not in ("archived", "unchanged"):
+            break
+
+
+def update(
+        dry_run: bool = False, base_url: str | None = None, progress=None, chart_ids: list[str] | None = None
+    ) -> UpdateResult:
+    """
+    Fetches, validates and archives every pending week of every chart in chart_ids
+    (default: the Hot 100), then syncs the derived indexes. Charts are updated side by
+    side; within a chart, weeks go in date order and the weeks after a failed, rejected
+    or unpublished one are not fetched, so the archive never gets a gap and the next run
+    retries from there. progress, if given, is called as progress(week label, status).
+    """
+    pending = {chart_id: get_pending_weeks(chart_id=chart_id) for chart_id in chart_ids or [DEFAULT_CHART]}
+    result = UpdateResult(pending=[
+        get_week_label(chart_id, chart_date) for chart_id, weeks in pending.items() for chart_date in weeks
+    ])
+    if dry_run:
+        return result
+
+    session = create_session(len(pending))
+    try:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = [
+                executor.submit(_update_chart, chart_id, weeks, session, base_url, result, progress)
+                for chart_id, weeks in pending.items()
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        session.close()
+
+    # The indexes and the history store are built from the default chart
+    result.indexed = {
+        "song history": sync_song_index(),
+        "artist stats": sync_artist_index(),
+        "year-end": sync_year_end(),
+        "search": sync_search_index(),
+        "history store": 0 if is_history_store_current() else build_history_store(),
+    }
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive newly published chart weeks and update the indexes.")
+    parser.add_argument("--dry-run", action="store_true", help="only list the weeks that would be fetched")
+    parser.add_argument("--base-url", default=None, help="charts URL prefix, e.g. a local fixture server")
+    parser.add_argument(
+        "--chart", action="append", choices=[*CHARTS, "all"], help="chart to update (repeatable, default hot-100)"
+    )
+    args = parser.parse_args()
+
+    def print_progress(label, status):
+        print(f"{label}: {status}", flush=True)
+
+    result = update(args.dry_run, args.base_url, print_progress, resolve_chart_ids(args.chart))
+    if args.dry_run:
+        print(f"{len(result.pending)} week(s) to fetch: {', '.join(result.pending) or 'none'}")
+        sys.exit(0)
+
+    print(f"Archived {len(result.archived)} of {len(result.pending)} pending week(s)")
+    for name, synced in result.indexed.items():
+        print(f"  {name}: {synced} re-indexed")
+    for label, problems in result.rejected.items():
+        print(f"  {label} rejected: {'; '.join(problems)}")
+    for label, error in result.failed.items():
+        print(f"  {label} failed: {error}")
+    sys.exit(1 if result.failed or result.rejected else 0)
@@ -1,36 +1,55 @@
+import numpy as np
 import pandas as pd
 
+from util.perf_util import timed
+
 # Custom order for longevity categories (used in plot_total_weeks_distribution)
 LONGEVITY_ORDER = ['1-5 Weeks', '6-15 Weeks', '16-30 Weeks', '31-45 Weeks', 
                    '46-60 Weeks', '61+ Weeks']
 
-def categorize_change(change_str: str):
-    """Categorizes the 'Change' string into 'Up', 'Down', 'Same', 'Return', 'New'."""
-    if pd.isna(change_str):
-        return "Unknown"
-    
-    change_str = str(change_str).strip()
-
-    if change_str == "NEW":
-        return "New"
-    elif change_str == "RE":
-        return "Return"
-    elif change_str == "=":
-        return "Same"
-    elif change_str.startswith("-"):
-        try:
-            val = int(change_str)
-            return "Down" if val < 0 else "Same"
-        except ValueError:
-            return "Unknown"
-    elif change_str.isdigit():
-        try:
-            val = int(change_str)
-            return "Up" if val > 0 else "Same"
-        except ValueError:
-            return "Unknown"
-    else:
-        return "Unknown"
+# Columns derived from 'Change' once when a chart is loaded (see add_change_columns)
+CHANGE_CATEGORIES = ["Up", "Down", "Same", "Return", "New", "Unknown"]
+CHANGE_COLUMNS = ["Change Category", "Change Int"]
+
+# Above this many rows, charts get pre-aggregated data instead of one mark per row
+AGGREGATE_ROW_THRESHOLD = 5000
+# Largest number of scatter points sent to the browser in aggregated mode
+MAX_SCATTER_POINTS = 2000
+
+@timed("viz.decode_change")
+def decode_change(change: pd.Series) -> pd.DataFrame:
+    """
+    Decodes 'Change' strings into a 'Change Category' ('Up', 'Down', 'Same', 'Return',
+    'New', 'Unknown') and a nullable 'Change Int' (spots moved, NA for NEW/RE).
+    Only the distinct change labels are parsed; rows are mapped through category codes.
+    """
+    change = change.astype("category")
+    labels = change.cat.categories.astype(str).str.strip()
+
+    is_number = labels.str.fullmatch(r"-?\d+")
+    delta = pd.to_numeric(labels.where(is_number), errors="coerce").to_numpy(dtype=float, copy=True)
+    delta[labels == "="] = 0
+
+    category = np.select(
+        [labels == "NEW", labels == "RE", delta > 0, delta < 0, delta == 0],
+        ["New", "Return", "Up", "Down", "Same"],
+        default="Unknown"
+    )
+
+    # Code -1 (missing value) picks the appended "Unknown" / NaN entry
+    codes = change.cat.codes.to_numpy()
+    return pd.DataFrame({
+        "Change Category": pd.Categorical(
+            np.append(category, "Unknown")[codes], categories=CHANGE_CATEGORIES
+        ),
+        "Change Int": pd.array(np.append(delta, np.nan)[codes], dtype="Int16"),
+    }, index=change.index)
+
+def add_change_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds the decoded change columns to df (in place) unless they are already there."""
+    if "Change" in df.columns and not set(CHANGE_COLUMNS).issubset(df.columns):
+        df[CHANGE_COLUMNS] = decode_change(df["Change"])
+    return df
     
 def categorize_longevity(df: pd.DataFrame):
     """
@@ -52,6 +71,7 @@ def categorize_longevity(df: pd.DataFrame):
     return df
 
 # Helper functions to prepare data for visualizations
+@timed("viz.week_distribution")
 def get_week_distribution_data(df: pd.DataFrame):
     plot_data = categorize_longevity(df.copy())
     
@@ -61,13 +81,50 @@ def get_week_distribution_data(df: pd.DataFrame):
         .reset_index(name='Count')
     )
 
+@timed("viz.peak_vs_weeks")
 def get_peak_vs_weeks_data(df: pd.DataFrame):
-    plot_data = df.copy()
-    plot_data['Change Category'] = plot_data['Change'].apply(categorize_change)
+    plot_data = add_change_columns(df.copy())
 
     return plot_data.dropna(subset=['Total Weeks', 'Peak Position', 'Title', 'Change Category'])
 
+@timed("viz.position_change")
 def get_position_change_distribution_data(df: pd.DataFrame):
-    change_data = df[~df['Change'].isin(['NEW', 'RE', '='])].copy()
-    change_data['Position Change Value'] = pd.to_numeric(change_data['Change'], errors='coerce')
-    return change_data.dropna(subset=['Position Change Value']).copy()
\ No newline at end of file
+    df = add_change_columns(df.copy())
+    change_data = df[df['Change Category'].isin(['Up', 'Down'])].copy()
+    change_data['Position Change Value'] = change_data['Change Int'].astype('int16')
+    return change_data
+
+def should_aggregate(df: pd.DataFrame) -> bool:
+    return len(df) > AGGREGATE_ROW_THRESHOLD
+
+@timed("viz.peak_vs_weeks_density")
+def get_peak_vs_weeks_density_data(plot_data: pd.DataFrame):
+    """
+    Collapses scatter rows into one point per (Total Weeks, Peak Position, Change Category)
+    with a 'Count'. If that is still more than MAX_SCATTER_POINTS, both axes are binned
+    into coarser cells (bin start values) until it fits.
+    """
+    step = 1
+    while True:
+        binned = plot_data.assign(**{
+            'Total Weeks': plot_data['Total Weeks'] // step * step,
+            'Peak Position': (plot_data['Peak Position'] - 1) // step * step + 1,
+        })
+        density = (
+            binned.groupby(['Total Weeks', 'Peak Position', 'Change Category'], observed=True)
+            .size()
+            .reset_index(name='Count')
+        )
+        if len(density) <= MAX_SCATTER_POINTS:
+            return density
+        step *= 2
+
+@timed("viz.position_change_histogram")
+def get_position_change_histogram_data(change_data: pd.DataFrame, bin_size: int):
+    """Pre-binned histogram of 'Position Change Value': 'Bin Start', 'Bin End' and 'Count' per bin."""
+    bin_start = change_data['Position Change Value'].astype(int) // bin_size * bin_size
+    histogram = bin_start.value_counts().sort_index().reset_index()
+    histogram.columns = ['Bin Start', 'Count']
+    histogram['Bin End'] = histogram['Bin Start'] + bin_size
+    return histogram
+
@@ -0,0 +1,202 @@
+"""
+Year-end and era summaries: top songs by chart points, weeks at No. 1, top debuts
+and longest runs for any year or span of years.
+
+All indexed weeks are stacked into one compact table (categorical song keys, int16
+ranks) and scored with vectorized group-bys. The per-song totals of every year are
+stored next to the archive and only recomputed for years whose weeks changed, so a
+span is answered by summing a few stored years.
+"""
+import pandas as pd
+
+from util.chart_store import connect
+from util.perf_util import timed
+from util.song_index import sync_song_index
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS year_end_songs (
+    year INTEGER NOT NULL,
+    song_key TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    chart_weeks INTEGER NOT NULL,
+    number_one_weeks INTEGER NOT NULL,
+    peak INTEGER NOT NULL,
+    total_weeks INTEGER NOT NULL,
+    debut_date TEXT,
+    debut_rank INTEGER,
+    PRIMARY KEY (year, song_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS year_end_years (
+    year INTEGER PRIMARY KEY,
+    indexed_weeks INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+CHART_SIZE = 100
+
+SUMMARY_COLUMNS = [
+    "Rank", "Title", "Artists", "Points", "Chart Weeks", "No. 1 Weeks", "Peak",
+    "Total Weeks", "Debut", "Debut Rank"
+]
+
+# ==============================================================================
+# 1. STACKED WEEKS
+# ==============================================================================
+
+def load_chart_table(conn, years: list[int]) -> pd.DataFrame:
+    """
+    Every indexed chart row of the given years as one compact frame: 'year' (int16),
+    'chart_date' and 'song_key' (categorical), 'rank' and 'weeks' (int16).
+    """
+    rows = conn.execute(
+        "SELECT chart_date, song_key, rank, weeks FROM song_weeks "
+        "WHERE chart_date BETWEEN ? AND ?",
+        (f"{min(years)}-01-01", f"{max(years)}-12-31")
+    ).fetchall()
+
+    chart_dates, song_keys, ranks, weeks = zip(*rows) if rows else ((), (), (), ())
+    table = pd.DataFrame({
+        "chart_date": pd.Categorical(chart_dates),
+        "song_key": pd.Categorical(song_keys),
+        "rank": pd.array(ranks, dtype="int16"),
+        "weeks": pd.array(weeks, dtype="int16"),
+    })
+
+    # The year is parsed once per distinct week, then spread through the category codes
+    week_years = table["chart_date"].cat.categories.str[:4].astype("int16")
+    table.insert(0, "year", week_years.take(table["chart_date"].cat.codes).to_numpy())
+    return table[table["year"].isin(years)]
+
+
+def score_years(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per (year, song) totals of a stacked chart table: points (CHART_SIZE + 1 - rank per
+    week), weeks in the year, weeks at No. 1, peak, longest reported run and the debut.
+    """
+    table = table.assign(
+        points=(CHART_SIZE + 1 - table["rank"]).astype("int16"),
+        number_one=(table["rank"] == 1)
+    )
+    totals = table.groupby(["year", "song_key"], observed=True, sort=False).agg(
+        points=("points", "sum"),
+        chart_weeks=("rank", "size"),
+        number_one_weeks=("number_one", "sum"),
+        peak=("rank", "min"),
+        total_weeks=("weeks", "max"),
+    )
+
+    # A song's first week on the chart (not a re-entry) is its debut
+    debuts = table.loc[table["weeks"] == 1, ["year", "song_key", "chart_date", "rank"]]
+    debuts = debuts.assign(chart_date=debuts["chart_date"].astype(str)).sort_values("chart_date")
+    debuts = debuts.drop_duplicates(["year", "song_key"]).set_index(["year", "song_key"])
+    totals["debut_date"] = debuts["chart_date"]
+    totals["debut_rank"] = debuts["rank"].astype("Int16")
+    return totals.reset_index()
+
+# ==============================================================================
+# 2. PER-YEAR CACHE
+# ==============================================================================
+
+@timed("year_end.sync")
+def sync_year_end() -> int:
+    """
+    Rescores the years whose indexed weeks changed since they were last scored (new or
+    re-fetched weeks). Weeks evicted from the archive stay in the song index, so they
+    keep counting. Returns how many years were rescored.
+    """
+    sync_song_index()
+    with connect() as conn:
+        conn.executescript(SCHEMA)
+        current = {
+            year: (indexed_weeks, fetched_at)
+            for year, indexed_weeks, fetched_at in conn.execute(
+                "SELECT CAST(substr(chart_date, 1, 4) AS INTEGER) AS year, COUNT(*), MAX(fetched_at) "
+                "FROM song_index_weeks GROUP BY year"
+            )
+        }
+        scored = {
+            year: (indexed_weeks, fetched_at)
+            for year, indexed_weeks, fetched_at in conn.execute(
+                "SELECT year, indexed_weeks, fetched_at FROM year_end_years"
+            )
+        }
+
+        gone = [(year,) for year in scored if year not in current]
+        conn.executemany("DELETE FROM year_end_songs WHERE year = ?", gone)
+        conn.executemany("DELETE FROM year_end_years WHERE year = ?", gone)
+
+        stale = sorted(year for year, state in current.items() if scored.get(year) != state)
+        if not stale:
+            return 0
+
+        totals = score_years(load_chart_table(conn, stale))
+        totals = totals.astype(object).where(totals.notna(), None)
+
+        conn.executemany("DELETE FROM year_end_songs WHERE year = ?", [(year,) for year in stale])
+        conn.executemany(
+            "INSERT INTO year_end_songs (year, song_key, points, chart_weeks, number_one_weeks, "
+            "peak, total_weeks, debut_date, debut_rank) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            totals.itertuples(index=False, name=None)
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO year_end_years (year, indexed_weeks, fetched_at) VALUES (?, ?, ?)",
+            [(year, *current[year]) for year in stale]
+        )
+    return len(stale)
+
+# ==============================================================================
+# 3. SUMMARIES
+# ==============================================================================
+
+def list_summary_years() -> list[int]:
+    """Years with at least one indexed chart week, oldest first."""
+    sync_year_end()
+    with connect() as conn:
+        return [row[0] for row in conn.execute("SELECT year FROM year_end_years ORDER BY year")]
+
+
+def _rank(totals: pd.DataFrame, by: list[str], ascending: list[bool], limit: int) -> pd.DataFrame:
+    board = totals.sort_values(by, ascending=ascending, kind="stable").head(limit)
+    board.insert(0, "Rank", range(1, len(board) + 1))
+    return board[SUMMARY_COLUMNS].reset_index(drop=True)
+
+
+@timed("year_end.summary")
+def get_year_end_summary(first_year: int, last_year: int, limit: int = 100) -> dict[str, pd.DataFrame]:
+    """
+    Year-end style rankings for the years first_year to last_year (inclusive), keyed
+    by name: 'Top Songs' (by points), 'Weeks at No. 1', 'Top Debuts' and 'Longest Runs'.
+    """
+    sync_year_end()
+    with connect() as conn:
+        totals = pd.read_sql_query("""
+            SELECT y.song_key,
+                   s.title AS "Title",
+                   s.artists AS "Artists",
+                   SUM(points) AS "Points",
+                   SUM(chart_weeks) AS "Chart Weeks",
+                   SUM(number_one_weeks) AS "No. 1 Weeks",
+                   MIN(peak) AS "Peak",
+                   MAX(total_weeks) AS "Total Weeks",
+                   MIN(debut_date) AS "Debut",
+                   MIN(debut_rank) AS "Debut Rank"
+            FROM year_end_songs y JOIN songs s ON s.song_key = y.song_key
+            WHERE year BETWEEN ? AND ?
+            GROUP BY y.song_key
+        """, conn, params=(first_year, last_year))
+
+    if totals.empty:
+        empty = pd.DataFrame(columns=SUMMARY_COLUMNS)
+        return {name: empty for name in ["Top Songs", "Weeks at No. 1", "Top Debuts", "Longest Runs"]}
+
+    totals["Debut Rank"] = totals["Debut Rank"].astype("Int16")
+    number_ones = totals[totals["No. 1 Weeks"] > 0]
+    debuts = totals[totals["Debut Rank"].notna()]
+
+    return {
+        "Top Songs": _rank(totals, ["Points", "Peak"], [False, True], limit),
+        "Weeks at No. 1": _rank(number_ones, ["No. 1 Weeks", "Points"], [False, False], limit),
+        "Top Debuts": _rank(debuts, ["Debut Rank", "Points"], [True, False], limit),
+        "Longest Runs": _rank(totals, ["Total Weeks", "Points"], [False, False], limit),
+    }
@@ -1,11 +1,15 @@
 import streamlit as st
 import altair as alt
 
+from util.perf_util import track
 from util.viz_util import (
     LONGEVITY_ORDER,
     get_peak_vs_weeks_data,
+    get_peak_vs_weeks_density_data,
     get_position_change_distribution_data,
-    get_week_distribution_data
+    get_position_change_histogram_data,
+    get_week_distribution_data,
+    should_aggregate
 )
 
 # Visualization Functions
@@ -43,7 +47,8 @@ def plot_total_weeks_distribution(df):
         color=alt.value('black')
     )
     
-    st.altair_chart(bar_chart + text, use_container_width=True)
+    with track("altair.week_distribution"):
+        st.altair_chart(bar_chart + text, use_container_width=True)
 
 
 def plot_peak_vs_weeks(df):
@@ -64,6 +69,26 @@ def plot_peak_vs_weeks(df):
         st.info("No data available to generate the Peak Position vs. Total Weeks plot.")
         return
 
+    if should_aggregate(plot_data):
+        # Large ranges: one sized point per cell instead of one point per row
+        density = get_peak_vs_weeks_density_data(plot_data)
+        scatter_chart = alt.Chart(density).mark_circle(opacity=0.7).encode(
+            x=alt.X('Total Weeks:Q', title='Total Weeks on Chart'),
+            y=alt.Y('Peak Position:Q', scale=alt.Scale(reverse=True),
+                    axis=alt.Axis(tickMinStep=1), title='Peak Position'),
+            size=alt.Size('Count:Q', title='Songs'),
+            tooltip=['Total Weeks', 'Peak Position', 'Change Category', 'Count'],
+            color=alt.Color('Change Category:N', scale=CHANGE_COLOR_SCALE, title='Position Change'),
+            order=alt.Order('Change Category', sort='descending')
+        ).properties(
+            width='container',
+            height=400
+        ).interactive()
+
+        with track("altair.peak_vs_weeks"):
+            st.altair_chart(scatter_chart, use_container_width=True)
+        return
+
     scatter_chart = alt.Chart(plot_data).mark_circle(size=80).encode(
         x=alt.X('Total Weeks:Q', title='Total Weeks on Chart'),
         y=alt.Y('Peak Position:Q', scale=alt.Scale(reverse=True), 
@@ -77,7 +102,8 @@ def plot_peak_vs_weeks(df):
         height=400
     ).interactive() 
     
-    st.altair_chart(scatter_chart, use_container_width=True)
+    with track("altair.peak_vs_weeks"):
+        st.altair_chart(scatter_chart, use_container_width=True)
 
 
 def plot_position_change_histogram(df):
@@ -96,6 +122,40 @@ def plot_position_change_histogram(df):
         return
     
     BIN_SIZE = 5
+
+    if should_aggregate(change_data):
+        # Large ranges: bin on the server and send one row per bin
+        histogram = get_position_change_histogram_data(change_data, BIN_SIZE)
+        histogram['Bin Center'] = histogram['Bin Start'] + BIN_SIZE / 2
+
+        hist_chart = alt.Chart(histogram).mark_bar().encode(
+            x=alt.X('Bin Start:Q', bin='binned', title='Position Change (Spots)'),
+            x2='Bin End:Q',
+            y=alt.Y('Count:Q', title='Number of Songs'),
+            tooltip=[
+                alt.Tooltip('Bin Start:Q', title='From'),
+                alt.Tooltip('Bin End:Q', title='To'),
+                'Count:Q'
+            ],
+            color=alt.value("teal")
+        ).properties(
+            width='container',
+            height=400
+        )
+
+        text = alt.Chart(histogram).mark_text(
+            align='center',
+            baseline='bottom',
+            dy=-4
+        ).encode(
+            x='Bin Center:Q',
+            y='Count:Q',
+            text=alt.Text('Count:Q')
+        )
+
+        with track("altair.position_change"):
+            st.altair_chart(hist_chart + text, use_container_width=True)
+        return
     
     hist_chart = alt.Chart(change_data).mark_bar().encode(
         x=alt.X(
@@ -127,4 +187,27 @@ def plot_position_change_histogram(df):
         tooltip=[]
     )
 
-    st.altair_chart(hist_chart + text, use_container_width=True)
\ No newline at end of file
+    with track("altair.position_change"):
+        st.altair_chart(hist_chart + text, use_container_width=True)
+
+def plot_song_history(history, title):
+    """
+    Creates and displays a line chart of a song's weekly rank over its whole chart run.
+    """
+    st.subheader(f"Chart Run of \"{title}\"")
+
+    if history.empty:
+        st.info("This song is not in the chart archive yet.")
+        return
+
+    line_chart = alt.Chart(history).mark_line(point=True).encode(
+        x=alt.X('Chart Date:T', title='Chart Week'),
+        y=alt.Y('Rank:Q', scale=alt.Scale(reverse=True, domain=[1, 100]), title='Rank'),
+        tooltip=[alt.Tooltip('Chart Date:T', title='Week'), 'Rank']
+    ).properties(
+        width='container',
+        height=400
+    ).interactive()
+
+    with track("altair.song_history"):
+        st.altair_chart(line_chart, use_container_width=True)